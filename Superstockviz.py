@@ -5,7 +5,6 @@ import datetime
 import os
 
 # External Imports
-import ibis
 import numpy as np
 import pandas as pd
 import streamlit as st
@@ -13,6 +12,12 @@ import streamlit.components.v1 as components
 
 # Local Imports
 import sviz
+from sviz.resources import (
+    get_cursor_pool,
+    get_intraday_prices,
+    get_query_cache,
+    get_stock_prices,
+)
 
 # Setup/Data Reading
 # Streamlit setup
@@ -49,13 +54,9 @@ st.markdown(
 )
 
 
-# Connect to motherduck database, and cache the connection
-@st.cache_resource
-def get_database_connection():
-    md_token = st.secrets["MOTHERDUCK_TOKEN"]
-    return ibis.duckdb.connect(f"md:?motherduck_token={md_token}")
-
-stock_prices = get_database_connection().table("stock_prices")
+# Tables of the connection shared by all sessions, see sviz.resources
+stock_prices = get_stock_prices()
+intraday_prices = get_intraday_prices()
 
 
 
@@ -113,6 +114,10 @@ st.write("""
     belongs to which sector and more.
 """)
 
+use_intraday = False
+if intraday_prices is not None:
+    use_intraday = st.checkbox("Use intraday (minute bar) prices")
+
 def submit_button_clicked():
     st.session_state.form_submitted = True
 
@@ -121,29 +126,45 @@ st.button("Submit", on_click=submit_button_clicked)
 def display_apaptive_chart(container):
     if len(ticker_list)==0:
         return None
-    stock_df = stock_prices.filter((stock_prices.ticker.isin(ticker_list)) & 
-                                   (stock_prices.Date <= end) & 
-                                   (stock_prices.Date >=start) &
-                                   (stock_prices["GICS Sector"].isin(industry_filter))).to_pandas()
-    stock_df["Date"] = pd.to_datetime(stock_df["Date"], format="%Y-%m-%d")
-    container.altair_chart(
-        sviz.stock_chart(
-            stock_data=stock_df,
-            tickers=ticker_list,
-            width=650,
-            upper_height=300,
-            lower_height=100,
-            date_col="Date",
-            ticker_col="ticker",
-            price_col="Close",
-            open_col="Open",
-            close_col="Close",
-            high_col="High",
-            low_col="Low",
-            aggregate_func="mean",
-        ),
-        use_container_width=True,
+    time_format = None
+    if use_intraday:
+        # Minute bars are resampled and aggregated in the database, so only
+        # about one bar per pixel is read
+        tickers = list(sp500info_df[sp500info_df["Symbol"].isin(ticker_list) &
+                                    sp500info_df["GICS Sector"].isin(industry_filter)]["Symbol"])
+        interval = sviz.display_interval(start, end, max_bars=650)
+        time_format = sviz.bar_time_format(interval)
+        bars = sviz.resample_bars(intraday_prices, tickers, start, end, interval=interval)
+        if len(ticker_list) > 10:
+            bars = sviz.aggregate_bars(bars, price_col="Close", aggregate_func="mean")
+        stock_df = sviz.fetch_bars(bars,
+                                   pool=get_cursor_pool(),
+                                   cache=get_query_cache())
+    else:
+        stock_df = sviz.fetch_frame(
+            stock_prices.filter((stock_prices.ticker.isin(ticker_list)) & 
+                                (stock_prices.Date <= end) & 
+                                (stock_prices.Date >=start) &
+                                (stock_prices["GICS Sector"].isin(industry_filter))),
+            pool=get_cursor_pool(),
+            cache=get_query_cache())
+    chart_spec = sviz.stock_chart_spec(
+        stock_data=stock_df,
+        tickers=ticker_list,
+        width=650,
+        upper_height=300,
+        lower_height=100,
+        date_col="Date",
+        ticker_col="ticker",
+        price_col="Close",
+        open_col="Open",
+        close_col="Close",
+        high_col="High",
+        low_col="Low",
+        aggregate_func="mean",
+        time_format=time_format,
     )
+    container.vega_lite_chart(chart_spec, use_container_width=True)
     st.session_state.form_submitted = False
 
 c=st.empty()
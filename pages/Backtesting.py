@@ -3,12 +3,17 @@
 from datetime import date
 
 # External Imports
-import ibis
 import pandas as pd
 import streamlit as st
 
 # Local Imports
 import sviz
+from sviz.resources import (
+    get_cursor_pool,
+    get_intraday_prices,
+    get_query_cache,
+    get_stock_prices,
+)
 
 # Page config
 st.set_page_config(layout="wide")
@@ -33,13 +38,9 @@ if 'data' not in st.session_state:
     data = pd.DataFrame({'ticker':[],'invest_amount':[],'start_date':[],'end_date':[]})
     st.session_state.data = data
 
-# Connect to motherduck database, and cache the connection
-@st.cache_resource
-def get_database_connection():
-    md_token = st.secrets["MOTHERDUCK_TOKEN"]
-    return ibis.duckdb.connect(f"md:?motherduck_token={md_token}")
-
-stock_prices = get_database_connection().table("stock_prices")
+# Tables of the connection shared by all sessions, see sviz.resources
+stock_prices = get_stock_prices()
+intraday_prices = get_intraday_prices()
 
 if 'sp500info_df' not in st.session_state:
     sp500info_df = pd.read_csv("./data/sp500info.csv", index_col=0)
@@ -86,6 +87,10 @@ def add_row(row):
 for r in range(num_rows):
     add_row(r)
 
+use_intraday = False
+if intraday_prices is not None:
+    use_intraday = st.checkbox("Use intraday (minute bar) prices")
+
 def read_form():
     data = pd.DataFrame({'ticker':[],'invest_amount':[],'start_date':[],'end_date':[]})
     st.session_state.data = data
@@ -118,16 +123,34 @@ def display_backtest_chart(container):
         selection = selection | ((stock_prices.ticker==t)&
                                  (stock_prices.Date>=start_date)&
                                  (stock_prices.Date<=end_date))
-    stock_df = stock_prices.filter(selection).to_pandas()
-    stock_df["Date"] = pd.to_datetime(stock_df["Date"], format="%Y-%m-%d").dt.date
-    gains_chart = sviz.backtest(stock_choice=st.session_state.data, 
-                              stock_df=stock_df, 
-                              width=650,
-                              upper_height=300, 
-                              lower_height=150,
-                              #adjust_inflation = adjust_inflation,
-                              price="Close")
-    container.altair_chart(gains_chart,use_container_width=True)
+    try:
+        if use_intraday:
+            # Buy and sell prices come from the minute bars of each investment,
+            # and only the gains shown in between are downsampled
+            bars = sviz.backtest_bars(intraday_prices,
+                                      st.session_state.data,
+                                      price="Close",
+                                      max_bars=650)
+            stock_df = sviz.fetch_bars(bars,
+                                       pool=get_cursor_pool(),
+                                       cache=get_query_cache())
+        else:
+            stock_df = sviz.fetch_frame(stock_prices.filter(selection),
+                                        pool=get_cursor_pool(),
+                                        cache=get_query_cache())
+        gains_spec = sviz.backtest_spec(stock_choice=st.session_state.data, 
+                                        stock_df=stock_df, 
+                                        width=650,
+                                        upper_height=300, 
+                                        lower_height=150,
+                                        #adjust_inflation = adjust_inflation,
+                                        price="Close",
+                                        time_format=sviz.MINUTE_FORMAT if use_intraday else None)
+    except ValueError as e:
+        container.write(str(e))
+        st.session_state.form_submitted = False
+        return None
+    container.vega_lite_chart(gains_spec,use_container_width=True)
     st.session_state.form_submitted = False
 
 c=st.empty()
@@ -135,6 +158,105 @@ c=st.empty()
 if st.session_state.form_submitted:
     display_backtest_chart(c)
 
+
+st.write('## Rule-Based Strategies')
+st.markdown(
+    """
+    Instead of choosing when to buy and sell, test a trading rule across many stocks at once. 
+    Moving average crossover holds every stock whose short term average price is above its 
+    long term average, momentum holds the stocks which gained the most recently and rebalances 
+    regularly, and dollar cost averaging invests a fixed amount in every stock on a schedule. 
+    Leave the tickers empty to run the strategy over the whole SP500.
+    """
+)
+
+if 'strategy_submitted' not in st.session_state:
+    st.session_state.strategy_submitted = False
+
+STRATEGY_NAMES = {'Moving Average Crossover': 'ma_crossover',
+                  'Momentum': 'momentum',
+                  'Dollar Cost Averaging': 'dca'}
+PERIODS = {'Weekly': 'W', 'Monthly': 'M', 'Quarterly': 'Q', 'Yearly': 'Y'}
+
+strategy_grid = st.columns(4)
+with strategy_grid[0]:
+    strategy_name = st.selectbox('Strategy', list(STRATEGY_NAMES))
+    strategy = STRATEGY_NAMES[strategy_name]
+with strategy_grid[1]:
+    strategy_amount = st.number_input(
+        'Amount to Invest Every Period' if strategy == 'dca' else 'Amount to Invest',
+        min_value=0, value=1000, step=100)
+with strategy_grid[2]:
+    strategy_start = st.date_input('Start Date', BEGIN_DATE,
+                                   min_value=BEGIN_DATE,
+                                   max_value=END_DATE,
+                                   key='strategy_start_date',
+                                   format="MM/DD/YYYY")
+with strategy_grid[3]:
+    strategy_end = st.date_input('End Date', END_DATE,
+                                 min_value=BEGIN_DATE,
+                                 max_value=END_DATE,
+                                 key='strategy_end_date',
+                                 format="MM/DD/YYYY")
+
+strategy_tickers = st.multiselect('Tickers to Trade', possible_tickers)
+
+param_grid = st.columns(3)
+if strategy == 'ma_crossover':
+    with param_grid[0]:
+        short_window = st.number_input('Short Average (days)', min_value=1, value=50)
+    with param_grid[1]:
+        long_window = st.number_input('Long Average (days)', min_value=2, value=200)
+    strategy_params = {'short_window': short_window, 'long_window': long_window}
+elif strategy == 'momentum':
+    with param_grid[0]:
+        lookback = st.number_input('Lookback (days)', min_value=1, value=126)
+    with param_grid[1]:
+        top_n = st.number_input('Number of Stocks Held', min_value=1, value=10)
+    with param_grid[2]:
+        rebalance = st.selectbox('Rebalance', list(PERIODS), index=1)
+    strategy_params = {'lookback': lookback, 'top_n': top_n,
+                       'rebalance': PERIODS[rebalance]}
+else:
+    with param_grid[0]:
+        frequency = st.selectbox('Invest', list(PERIODS), index=1)
+    strategy_params = {'frequency': PERIODS[frequency]}
+
+def strategy_button_clicked():
+    st.session_state.strategy_submitted = True
+
+st.button('Run Strategy', on_click=strategy_button_clicked)
+
+def display_strategy_chart(container):
+    tickers = strategy_tickers if strategy_tickers else list(possible_tickers)
+    stock_df = sviz.fetch_frame(
+        stock_prices.filter((stock_prices.ticker.isin(tickers)) &
+                            (stock_prices.Date >= strategy_start) &
+                            (stock_prices.Date <= strategy_end))
+                    .select("Date", "ticker", "Close"),
+        pool=get_cursor_pool(),
+        cache=get_query_cache())
+    if len(stock_df) == 0:
+        container.write("No prices found for the chosen tickers and dates")
+        return None
+    strategy_spec = sviz.strategy_spec(stock_df=stock_df,
+                                       strategy=strategy,
+                                       invest_amount=strategy_amount,
+                                       width=650,
+                                       upper_height=300,
+                                       lower_height=150,
+                                       price="Close",
+                                       # One line per ticker is unreadable for many tickers
+                                       by_ticker=len(tickers) <= 10,
+                                       **strategy_params)
+    container.vega_lite_chart(strategy_spec, use_container_width=True)
+    st.session_state.strategy_submitted = False
+
+strategy_container = st.empty()
+
+if st.session_state.strategy_submitted:
+    display_strategy_chart(strategy_container)
+
 st.markdown(
     """
     ## Data Sources:  
@@ -7,9 +7,50 @@ __all__ = [
     "aggregate_company",
     "parse_tickers",
     "stock_chart", 
-    "backtest"
+    "backtest",
+    "optimize_arrow",
+    "load_frame",
+    "frame_nbytes",
+    "FrameBudget",
+    "CursorPool",
+    "SharedQueryCache",
+    "fetch_frame",
+    "templates",
+    "stock_chart_spec",
+    "backtest_spec",
+    "INTRADAY_TABLE",
+    "MINUTE_FORMAT",
+    "display_interval",
+    "bar_time_format",
+    "resample_bars",
+    "aggregate_bars",
+    "backtest_bars",
+    "fetch_bars",
+    "strategies",
+    "strategy_gains",
+    "strategy_chart",
+    "strategy_spec",
 ]
 
 from .charts import candlestick, multiple_company, aggregate_company, stock_chart
 from .parse_tickers import parse_tickers
-from .backtest import backtest
\ No newline at end of file
+from .backtest import backtest
+from .memory import (
+    optimize_arrow,
+    load_frame,
+    frame_nbytes,
+    FrameBudget,
+)
+from .shared_cache import CursorPool, SharedQueryCache, fetch_frame
+from .templates import stock_chart_spec, backtest_spec, strategy_spec
+from .intraday import (
+    INTRADAY_TABLE,
+    MINUTE_FORMAT,
+    display_interval,
+    bar_time_format,
+    resample_bars,
+    aggregate_bars,
+    backtest_bars,
+    fetch_bars,
+)
+from .strategies import strategy_gains, strategy_chart
@@ -7,6 +7,7 @@ import altair as alt
 import pandas as pd
 
 # Local Imports
+from .charts import configure_time_format
 
 # Setup vegafusion
 alt.data_transformers.enable("vegafusion")
@@ -21,21 +22,59 @@ def backtest(
     #adjust_inflation:bool=False,
     price: str = "Close",
 ) -> alt.Chart:   
-    ticker_gains_list = []
     if len(stock_choice) == 0:
         return None
+    total_gains = backtest_gains(stock_choice, stock_df, price=price)
+    return gains_chart(
+        total_gains,
+        width=width,
+        upper_height=upper_height,
+        lower_height=lower_height,
+        title=gains_title(total_gains),
+    )
+
+
+def backtest_gains(
+    stock_choice: pd.DataFrame,
+    stock_df: pd.DataFrame,
+    price: str = "Close",
+) -> pd.DataFrame:
+    """Find the gains over time of a set of investments
+
+    Raises a ValueError if there are no prices for one of the investments.
+
+    Args:
+        stock_choice (pd.DataFrame): Investments, with ticker, invest_amount,
+            start_date and end_date columns
+        stock_df (pd.DataFrame): Stock price data, with daily or intraday
+            prices
+        price (str): Name of column containing the price
+
+    Returns:
+        pd.DataFrame: Long DataFrame with Date, ticker and gains columns,
+            including the sum of all investments as the Total ticker
+    """
+    ticker_gains_list = []
     stock_df = stock_df.sort_values(by="Date")
+    # Compare as timestamps, so dates and intraday bars are both supported
+    dates = pd.to_datetime(stock_df["Date"])
     for _, row in stock_choice.iterrows():
         ticker = row["ticker"]
         # if ticker not in stock_df["ticker"]:
         #     return None
-        start_date = row["start_date"]
-        end_date = row["end_date"]
-        ticker_df = stock_df.loc[(stock_df["Date"]>=start_date)&
-                                     (stock_df["Date"]<=end_date)&
+        start_date = pd.Timestamp(row["start_date"])
+        end_date = pd.Timestamp(row["end_date"]) + pd.Timedelta(days=1)
+        ticker_df = stock_df.loc[(dates>=start_date)&
+                                     (dates<end_date)&
                                      (stock_df["ticker"]==ticker), ["Date", price]]
         ticker_df = ticker_df.set_index("Date")
-        ticker_series = ticker_df[price]
+        # Prices may be stored as float32, but money is computed in float64
+        ticker_series = ticker_df[price].astype("float64")
+        if len(ticker_series) == 0:
+            raise ValueError(
+                f"No {ticker} prices found between {row['start_date']} "
+                f"and {row['end_date']}"
+            )
         start_price = ticker_series.iloc[0]
         stock_amount = row["invest_amount"] / start_price
         ticker_series = ticker_series * stock_amount
@@ -59,15 +98,49 @@ def backtest(
 
     # if adjust_inflation:
     #     total_gains["gains"] = inflate_df(total_gains, "Date", "gains")
-    # Find the total gained
-    total_gain = total_gains[total_gains["ticker"] == "Total"]["gains"].iloc[-1]
+    return total_gains
 
-    time_brush = alt.selection_interval(encodings=["x"])
 
-    title = alt.TitleParams(
+def gains_title(total_gains: pd.DataFrame) -> alt.TitleParams:
+    """Create the chart title showing the total gained
+
+    Args:
+        total_gains (pd.DataFrame): Gains, as returned by backtest_gains
+
+    Returns:
+        alt.TitleParams: Title for the gains chart
+    """
+    total_gain = total_gains[total_gains["ticker"] == "Total"]["gains"].iloc[-1]
+    return alt.TitleParams(
         "Total Gained: ${:,.2f}".format(total_gain), anchor="middle"
     )
 
+
+def gains_chart(
+    total_gains: pd.DataFrame,
+    width: int | float = 650,
+    upper_height: int | float = 650,
+    lower_height: int | float = 100,
+    title: alt.TitleParams | str = alt.Undefined,
+    time_format: str | None = None,
+) -> alt.Chart:
+    """Create a line chart of gains over time using altair
+
+    Args:
+        total_gains (pd.DataFrame): Gains, as returned by backtest_gains
+        width (int|float): Width of the chart
+        upper_height (int|float): Height of gains chart
+        lower_height (int|float): Height of time selector
+        title (alt.TitleParams|str): Title of the gains chart
+        time_format (str|None): D3 time format of dates in the tooltips,
+            like "%Y-%m-%d %H:%M" for intraday prices, or None for the default
+
+    Returns:
+        alt.Chart: Line chart of gains with tickers differentiated by color,
+            and time selection chart below
+    """
+    time_brush = alt.selection_interval(encodings=["x"])
+
     gains_chart = (
         alt.Chart(total_gains, title=title)
         .mark_line()
@@ -75,7 +148,7 @@ def backtest(
             alt.X("Date:T", scale=alt.Scale(domain=time_brush), title="Date"),
             alt.Y("gains:Q", title="Gains (USD)"),
             alt.Color("ticker:N", title="Ticker"),
-            alt.Tooltip(["Date", "ticker", "gains"]),
+            alt.Tooltip(["Date:T", "ticker:N", "gains:Q"]),
         )
         .properties(width=width, height=upper_height)
     )
@@ -88,12 +161,12 @@ def backtest(
             alt.X("Date:T"),
             alt.Y("gains:Q", title="Gains (USD)"),
             alt.Color("ticker:N", title="Ticker"),
-            alt.Tooltip(["Date", "ticker", "gains"]),
+            alt.Tooltip(["Date:T", "ticker:N", "gains:Q"]),
         )
         .properties(width=width, height=lower_height)
     )
 
-    return alt.vconcat(gains_chart, time_chart)
+    return configure_time_format(alt.vconcat(gains_chart, time_chart), time_format)
 
 
 # def inflate_df(df: pd.DataFrame, date_col: str, value_col: str, **kwargs) -> pd.Series:
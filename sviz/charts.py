@@ -1,6 +1,7 @@
 # Imports
 # Standard Library Imports
 from __future__ import annotations
+import threading
 
 # External Imports
 import altair as alt
@@ -11,6 +12,11 @@ import pandas as pd
 # Setup vegafusion
 alt.data_transformers.enable("vegafusion")
 
+# Altair's data transformer and theme are global state, which
+# templates.compile_template temporarily swaps while serializing a chart, so
+# it holds this lock to keep concurrent sessions from seeing the swap
+ALTAIR_LOCK = threading.Lock()
+
 
 # region Wrapper Function
 
@@ -29,6 +35,7 @@ def stock_chart(
     high_col: str = "High",
     low_col: str = "Low",
     aggregate_func: str = "mean",
+    time_format: str | None = None,
 ) -> alt.Chart:
     if len(tickers) == 1:
         ticker = tickers[0]
@@ -40,6 +47,7 @@ def stock_chart(
                 lower_height=lower_height,
                 date_col=date_col,
                 price_col=price_col,
+                time_format=time_format,
             )
         return candlestick(
             stock_data=stock_data[stock_data[ticker_col] == ticker],
@@ -51,6 +59,7 @@ def stock_chart(
             close_col=close_col,
             high_col=high_col,
             low_col=low_col,
+            time_format=time_format,
         )
     if 2 <= len(tickers) <= 10:
         return multiple_company(
@@ -61,6 +70,7 @@ def stock_chart(
             date_col=date_col,
             price_col=price_col,
             ticker_col=ticker_col,
+            time_format=time_format,
         )
     return aggregate_company(
         stock_data=stock_data,
@@ -70,6 +80,7 @@ def stock_chart(
         date_col=date_col,
         price_col=price_col,
         aggregate_func=aggregate_func,
+        time_format=time_format,
     )
 
 
@@ -89,6 +100,7 @@ def candlestick(
     close_col: str = "Close",
     high_col: str = "High",
     low_col: str = "Low",
+    time_format: str | None = None,
 ):
     """Create a candlestick chart for stock data using altair
 
@@ -102,6 +114,9 @@ def candlestick(
         close_col (str): Name of column constaining the close price
         high_col (str): Name of column containing the high price
         low_col (str): Name of column containing the low price
+        time_format (str|None): D3 time format of dates in the axis and
+            tooltips, like "%Y-%m-%d %H:%M" for intraday bars, or None for
+            the default
 
     Returns:
         alt.Chart: Candlestick chart with full year brush
@@ -122,7 +137,7 @@ def candlestick(
         alt.Chart(stock_data)
         .encode(
             alt.X(f"{date_col}:T", scale=alt.Scale(domain=time_brush))
-            .axis(format="%Y-%m-%d")
+            .axis(format=time_format or "%Y-%m-%d")
             .title("Date"),
             color=open_close_color,
         )
@@ -139,12 +154,12 @@ def candlestick(
         alt.Y2("Close:Q"),
         alt.Tooltip(
             [
-                "Date",
-                "ticker",
-                f"{high_col}",
-                f"{low_col}",
-                f"{open_col}",
-                f"{close_col}",
+                f"{date_col}:T",
+                "ticker:N",
+                f"{high_col}:Q",
+                f"{low_col}:Q",
+                f"{open_col}:Q",
+                f"{close_col}:Q",
             ]
         ),
     )
@@ -154,19 +169,19 @@ def candlestick(
         .mark_circle(color="blue")
         .encode(
             alt.X(f"{date_col}:T", scale=alt.Scale(domain=time_brush))
-            .axis(format="%Y-%m-%d")
+            .axis(format=time_format or "%Y-%m-%d")
             .title("Date"),
             alt.Y("median:Q").scale(zero=False),
             alt.Tooltip(
                 [
-                    "Date",
-                    "ticker",
-                    "title",
-                    "publisher",
-                    f"{high_col}",
-                    f"{low_col}",
-                    f"{open_col}",
-                    f"{close_col}",
+                    f"{date_col}:T",
+                    "ticker:N",
+                    "title:N",
+                    "publisher:N",
+                    f"{high_col}:Q",
+                    f"{low_col}:Q",
+                    f"{open_col}:Q",
+                    f"{close_col}:Q",
                 ]
             ),
         )
@@ -181,22 +196,24 @@ def candlestick(
         .add_params(time_brush)
         .encode(
             alt.X("Date:T"),
-            alt.Y(f"{close_col}", title="Close (USD)"),
+            alt.Y(f"{close_col}:Q", title="Close (USD)"),
             alt.Tooltip(
                 [
-                    "Date",
-                    "ticker",
-                    f"{high_col}",
-                    f"{low_col}",
-                    f"{open_col}",
-                    f"{close_col}",
+                    f"{date_col}:T",
+                    "ticker:N",
+                    f"{high_col}:Q",
+                    f"{low_col}:Q",
+                    f"{open_col}:Q",
+                    f"{close_col}:Q",
                 ]
             ),
         )
         .properties(width=width, height=lower_height)
     )
 
-    return alt.vconcat(rule + bar + news_point, full_year)
+    return configure_time_format(
+        alt.vconcat(rule + bar + news_point, full_year), time_format
+    )
 
 
 def multiple_company(
@@ -207,6 +224,7 @@ def multiple_company(
     date_col: str = "Date",
     price_col: str = "Open",
     ticker_col: str = "ticker",
+    time_format: str | None = None,
 ):
     """Create a candlestick chart for stock data using altair
 
@@ -218,6 +236,9 @@ def multiple_company(
         date (str): Name of column containing the date
         price_col (str): Name of column containing the price
         ticker_col (str): Name of column constaining the tickers
+        time_format (str|None): D3 time format of dates in the axis and
+            tooltips, like "%Y-%m-%d %H:%M" for intraday bars, or None for
+            the default
 
     Returns:
         alt.Chart: Line chart with companies differentiated by color,
@@ -233,7 +254,7 @@ def multiple_company(
         .encode(
             alt.Y(f"{price_col}:Q", title="Price"),
             alt.Color(f"{ticker_col}:N", title="Ticker"),
-            alt.Tooltip([f"{date_col}", f"{ticker_col}", f"{price_col}"]),
+            alt.Tooltip([f"{date_col}:T", f"{ticker_col}:N", f"{price_col}:Q"]),
         )
     )
 
@@ -246,10 +267,12 @@ def multiple_company(
         .mark_circle(size=100)
         .encode(
             alt.X(f"{date_col}:T", scale=alt.Scale(domain=time_brush))
-            .axis(format="%Y-%m-%d")
+            .axis(format=time_format or "%Y-%m-%d")
             .title("Date"),
             alt.Y(f"{price_col}:Q", title="Price"),
-            alt.Tooltip(["Date", "ticker", "title", "publisher", f"{price_col}"]),
+            alt.Tooltip(
+                [f"{date_col}:T", f"{ticker_col}:N", "title:N", "publisher:N", f"{price_col}:Q"]
+            ),
             alt.Color(f"{ticker_col}:N", title="Ticker"),
         )
         .properties(width=width, height=upper_height)
@@ -260,11 +283,13 @@ def multiple_company(
     time_chart = (
         base_chart.add_params(time_brush)
         .encode(alt.X(f"{date_col}:T"),
-                alt.Tooltip([f"{date_col}", f"{ticker_col}", f"{price_col}"]))
+                alt.Tooltip([f"{date_col}:T", f"{ticker_col}:N", f"{price_col}:Q"]))
         .properties(width=width, height=lower_height)
     )
 
-    return alt.vconcat(stock_chart + news_point, time_chart)
+    return configure_time_format(
+        alt.vconcat(stock_chart + news_point, time_chart), time_format
+    )
 
 
 def aggregate_company(
@@ -276,6 +301,7 @@ def aggregate_company(
     price_col: str = "Open",
     ticker_col: str = "ticker",
     aggregate_func: str = "mean",
+    time_format: str | None = None,
 ):
     """Create a candlestick chart for stock data using altair
 
@@ -289,6 +315,9 @@ def aggregate_company(
         ticker_col (str): Name of column constaining the tickers
         aggregate_func (str): String describing function to use for
             aggregation, like median, mean, etc.
+        time_format (str|None): D3 time format of dates in the axis and
+            tooltips, like "%Y-%m-%d %H:%M" for intraday bars, or None for
+            the default
 
     Returns:
         alt.Chart: Line chart with companies aggregated,
@@ -306,7 +335,7 @@ def aggregate_company(
 
     stock_chart = base_chart.encode(
         alt.X(f"{date_col}:T", scale=alt.Scale(domain=time_brush), title="Date"),
-        alt.Tooltip([f"{date_col}", f"{aggregate_func}({price_col}):Q"]),
+        alt.Tooltip([f"{date_col}:T", f"{aggregate_func}({price_col}):Q"]),
     ).properties(width=width, height=upper_height)
 
     # time chart selector
@@ -316,7 +345,30 @@ def aggregate_company(
         .properties(width=width, height=lower_height)
     )
 
-    return alt.vconcat(stock_chart, time_chart)
+    return configure_time_format(alt.vconcat(stock_chart, time_chart), time_format)
 
 
 # endregion Individual Charting Functions
+
+
+# region Helper Functions
+
+
+def configure_time_format(
+    chart: alt.VConcatChart, time_format: str | None = None
+) -> alt.VConcatChart:
+    """Set the default format of dates in a chart's tooltips
+
+    Args:
+        chart (alt.VConcatChart): Top level chart
+        time_format (str|None): D3 time format, or None to keep the default
+
+    Returns:
+        alt.VConcatChart: Chart with the format configured
+    """
+    if time_format is None:
+        return chart
+    return chart.configure(timeFormat=time_format)
+
+
+# endregion Helper Functions
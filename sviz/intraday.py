@@ -0,0 +1,286 @@
+# Imports
+# Standard Library Imports
+from __future__ import annotations
+import datetime
+
+# External Imports
+import ibis
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Local Imports
+from .memory import optimize_arrow
+from .shared_cache import CursorPool, SharedQueryCache
+
+# Table of minute bars, with Timestamp, ticker, Open, High, Low, Close and
+# optionally Volume columns
+INTRADAY_TABLE = "stock_prices_intraday"
+
+# Default maximum number of bars per ticker, about one per pixel of a chart
+DEFAULT_MAX_BARS = 1000
+# Default maximum number of rows read from a single query
+DEFAULT_MAX_ROWS = 2_000_000
+# Number of rows per streamed batch
+DEFAULT_BATCH_SIZE = 100_000
+
+# Bar intervals from finest to coarsest, with the number of bars per trading
+# day, the function bucketing the timestamps and the D3 format of their times
+BAR_INTERVALS = {
+    "1min": (390, lambda ts: ts.bucket(minutes=1), "%Y-%m-%d %H:%M"),
+    "5min": (78, lambda ts: ts.bucket(minutes=5), "%Y-%m-%d %H:%M"),
+    "15min": (26, lambda ts: ts.bucket(minutes=15), "%Y-%m-%d %H:%M"),
+    "30min": (13, lambda ts: ts.bucket(minutes=30), "%Y-%m-%d %H:%M"),
+    # Aligned to the 9:30 open, instead of to the hour
+    "1h": (
+        7,
+        lambda ts: ts.bucket(hours=1, offset=ibis.interval(minutes=30)),
+        "%Y-%m-%d %H:%M",
+    ),
+    "1D": (1, lambda ts: ts.truncate("D"), "%Y-%m-%d"),
+    "1W": (1 / 5, lambda ts: ts.truncate("W"), "%Y-%m-%d"),
+    "1M": (1 / 21, lambda ts: ts.truncate("M"), "%Y-%m-%d"),
+}
+# Format of the times of prices at minute resolution, as in backtest_bars
+MINUTE_FORMAT = BAR_INTERVALS["1min"][2]
+
+
+# region Resampling
+
+
+def display_interval(
+    start: datetime.date, end: datetime.date, max_bars: int = DEFAULT_MAX_BARS
+) -> str:
+    """Choose the finest bar interval showing a date range in at most max_bars
+
+    Args:
+        start (datetime.date): First date of the range
+        end (datetime.date): Last date of the range
+        max_bars (int): Maximum number of bars per ticker
+
+    Returns:
+        str: Bar interval, one of the keys of BAR_INTERVALS
+    """
+    trading_days = max(np.busday_count(start, end + datetime.timedelta(days=1)), 1)
+    for interval, (bars_per_day, _, _) in BAR_INTERVALS.items():
+        if trading_days * bars_per_day <= max_bars:
+            return interval
+    return list(BAR_INTERVALS)[-1]
+
+
+def day_bounds(
+    start: datetime.date, end: datetime.date
+) -> tuple[datetime.datetime, datetime.datetime]:
+    """Find the times bounding a range of whole days
+
+    Args:
+        start (datetime.date): First date of the range
+        end (datetime.date): Last date of the range
+
+    Returns:
+        tuple[datetime.datetime, datetime.datetime]: Start of the first day,
+            and start of the day after the last
+    """
+    start_time = datetime.datetime.combine(start, datetime.time())
+    end_time = datetime.datetime.combine(
+        end + datetime.timedelta(days=1), datetime.time()
+    )
+    return start_time, end_time
+
+
+def bar_time_format(interval: str) -> str:
+    """Find the D3 format showing the times of bars of an interval
+
+    Args:
+        interval (str): Bar interval, one of the keys of BAR_INTERVALS
+
+    Returns:
+        str: D3 time format, for the time_format argument of the charts
+    """
+    return BAR_INTERVALS[interval][2]
+
+
+def resample_bars(
+    table: ibis.Table,
+    tickers: list[str],
+    start: datetime.date,
+    end: datetime.date,
+    interval: str | None = None,
+    max_bars: int = DEFAULT_MAX_BARS,
+) -> ibis.Table:
+    """Resample minute bars to a coarser interval, in the database
+
+    Args:
+        table (ibis.Table): Table of minute bars
+        tickers (list[str]): Tickers to include
+        start (datetime.date): First date to include
+        end (datetime.date): Last date to include
+        interval (str|None): Bar interval, one of the keys of BAR_INTERVALS,
+            or None to choose one with display_interval
+        max_bars (int): Maximum number of bars per ticker, when choosing
+            the interval
+
+    Returns:
+        ibis.Table: Expression for bars with Date (the start of the bar,
+            clipped to the start of the range), ticker, Open, High, Low,
+            Close and Volume columns, as well as empty title and publisher
+            columns matching the daily table. A bar's Close is its last
+            price, later than Date, so use backtest_bars for trading prices
+    """
+    if interval is None:
+        interval = display_interval(start, end, max_bars)
+    bucket = BAR_INTERVALS[interval][1]
+    start_time, end_time = day_bounds(start, end)
+    bars = table.filter(
+        table.ticker.isin(tickers)
+        & (table.Timestamp >= start_time)
+        & (table.Timestamp < end_time)
+    )
+    metrics = dict(
+        Open=bars.Open.argmin(bars.Timestamp),
+        High=bars.High.max(),
+        Low=bars.Low.min(),
+        Close=bars.Close.argmax(bars.Timestamp),
+    )
+    if "Volume" in bars.columns:
+        # DuckDB sums integers to a 128 bit decimal, which pandas can only
+        # hold as objects, and casting the sum is dropped by ibis
+        metrics["Volume"] = bars.Volume.cast("float64").sum()
+    # Weekly and monthly buckets can start before the range
+    label = ibis.greatest(bucket(bars.Timestamp), ibis.timestamp(start_time))
+    return (
+        bars.group_by(Date=label, ticker=bars.ticker)
+        .aggregate(**metrics)
+        .mutate(
+            title=ibis.null().cast("string"),
+            publisher=ibis.null().cast("string"),
+        )
+        .order_by(["ticker", "Date"])
+    )
+
+
+def aggregate_bars(
+    bars: ibis.Table, price_col: str = "Close", aggregate_func: str = "mean"
+) -> ibis.Table:
+    """Aggregate the price of resampled bars across tickers, in the database
+
+    Args:
+        bars (ibis.Table): Resampled bars, as returned by resample_bars
+        price_col (str): Name of column containing the price
+        aggregate_func (str): Name of the aggregation, like mean, median, etc.
+
+    Returns:
+        ibis.Table: Expression with one row per bar, with Date and price_col
+            columns
+    """
+    return (
+        bars.group_by("Date")
+        .aggregate(**{price_col: getattr(bars[price_col], aggregate_func)()})
+        .order_by("Date")
+    )
+
+
+def backtest_bars(
+    table: ibis.Table,
+    stock_choice: pd.DataFrame,
+    price: str = "Close",
+    max_bars: int = DEFAULT_MAX_BARS,
+) -> ibis.Table:
+    """Find the prices to backtest investments on minute bars, in the database
+
+    Every investment is priced from the minute bars in its own window: it is
+    bought at the first minute and sold at the last one. In between, the
+    price is downsampled for display to at most max_bars points, each being
+    the last price in its bucket and dated at the minute of that price, so
+    no price is dated before it happened or outside the window.
+
+    Args:
+        table (ibis.Table): Table of minute bars
+        stock_choice (pd.DataFrame): Investments, with ticker, invest_amount,
+            start_date and end_date columns
+        price (str): Name of column containing the price
+        max_bars (int): Maximum number of points per investment
+
+    Returns:
+        ibis.Table: Expression with Date, ticker and price columns, for
+            backtest_gains
+    """
+    positions = []
+    for _, row in stock_choice.iterrows():
+        start_time, end_time = day_bounds(row["start_date"], row["end_date"])
+        window = table.filter(
+            (table.ticker == row["ticker"])
+            & (table.Timestamp >= start_time)
+            & (table.Timestamp < end_time)
+        )
+        bucket = BAR_INTERVALS[
+            display_interval(row["start_date"], row["end_date"], max_bars)
+        ][1]
+        first = window.aggregate(
+            Date=window.Timestamp.min(),
+            ticker=window.ticker.arbitrary(),
+            **{price: window[price].argmin(window.Timestamp)},
+        )
+        samples = window.group_by(
+            bucket=bucket(window.Timestamp), ticker=window.ticker
+        ).aggregate(
+            Date=window.Timestamp.max(),
+            **{price: window[price].argmax(window.Timestamp)},
+        )
+        positions += [first, samples.select("Date", "ticker", price)]
+    # An empty window still aggregates to a row, of nulls
+    prices = ibis.union(*positions, distinct=True)
+    return prices.filter(prices.Date.notnull()).order_by(["ticker", "Date"])
+
+
+# endregion Resampling
+
+
+# region Streaming
+
+
+def fetch_bars(
+    expr: ibis.Table,
+    pool: CursorPool,
+    cache: SharedQueryCache,
+    max_rows: int = DEFAULT_MAX_ROWS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> pd.DataFrame:
+    """Execute a bar expression through the cursor pool and shared cache
+
+    The result is streamed in batches, and reading stops with an error once
+    more than max_rows rows are read, so memory use stays bounded.
+
+    Args:
+        expr (ibis.Table): Expression to execute, like resample_bars
+        pool (CursorPool): Pool to borrow a cursor from
+        cache (SharedQueryCache): Cache keyed by the compiled SQL
+        max_rows (int): Maximum number of rows to read
+        batch_size (int): Number of rows per streamed batch
+
+    Returns:
+        pd.DataFrame: Result of the expression with optimized dtypes, with
+            Date kept as timestamps
+    """
+    sql = str(ibis.to_sql(expr, dialect="duckdb"))
+
+    def load() -> pd.DataFrame:
+        batches = []
+        num_rows = 0
+        with pool.cursor() as cur:
+            reader = cur.execute(sql).fetch_record_batch(batch_size)
+            for batch in reader:
+                num_rows += batch.num_rows
+                if num_rows > max_rows:
+                    raise ValueError(
+                        f"Query returned more than {max_rows} rows, "
+                        "use a coarser interval"
+                    )
+                batches.append(batch)
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+        return optimize_arrow(table, date_cols=())
+
+    return cache.get_or_load(sql, load)
+
+
+# endregion Streaming
@@ -0,0 +1,803 @@
+"""Multi-session load test for the SuperStockViz pages
+
+Starts the app with ``streamlit run`` against a local DuckDB database filled
+with synthetic prices, then drives it with many concurrent scripted clients
+speaking the same websocket protocol as the browser. Reports render latency
+percentiles, throughput and the peak memory of the server.
+
+A real server is used rather than ``AppTest``, since ``AppTest`` swaps global
+streamlit state on every run and so can't run sessions concurrently.
+
+Run from the repository root with::
+
+    python -m sviz.loadtest --users 10 50 200
+
+adding ``--intraday-tickers 5`` to also test the minute bar charts and
+backtests, on synthetic minute bars for 5 tickers. To compare the render
+overhead of altair charts and compiled templates::
+
+    python -m sviz.loadtest --render-benchmark
+"""
+
+# Imports
+# Standard Library Imports
+from __future__ import annotations
+import argparse
+import asyncio
+import datetime
+import functools
+import os
+from pathlib import Path
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+# External Imports
+import duckdb
+import numpy as np
+import pandas as pd
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+# Local Imports
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+MAIN_PAGE = "Superstockviz"
+BACKTEST_PAGE = "Backtesting"
+# Label of the checkbox switching both pages to minute bars
+INTRADAY_CHECKBOX = "Use intraday (minute bar) prices"
+
+START_DATE = datetime.date(2014, 1, 1)
+END_DATE = datetime.date(2023, 12, 31)
+
+# Seconds to wait for the server to start, and for a single script run
+STARTUP_TIMEOUT = 60
+RUN_TIMEOUT = 600
+
+
+# region Synthetic Database
+
+
+def make_synthetic_database(
+    path: str | os.PathLike,
+    sp500info_path: str | os.PathLike = APP_ROOT / "data" / "sp500info.csv",
+    start: datetime.date = START_DATE,
+    end: datetime.date = END_DATE,
+    news_per_year: int = 10,
+    intraday_tickers: int = 0,
+    seed: int = 0,
+):
+    """Create a DuckDB database with a synthetic stock_prices table
+
+    Prices follow a geometric random walk for every ticker in the SP500
+    information file, with a few news headlines per ticker and year.
+    Optionally, minute bars interpolating the daily prices are added for
+    the first tickers, in a stock_prices_intraday table.
+
+    Args:
+        path (str|os.PathLike): Path of the database file to (re)create
+        sp500info_path (str|os.PathLike): Path to the SP500 information csv
+        start (datetime.date): First date of price data
+        end (datetime.date): Last date of price data
+        news_per_year (int): Number of news headlines per ticker and year
+        intraday_tickers (int): Number of tickers to create minute bars for
+        seed (int): Seed for the random number generator
+    """
+    rng = np.random.default_rng(seed)
+    sp500info_df = pd.read_csv(sp500info_path, index_col=0)
+    dates = pd.bdate_range(start, end)
+    n_dates, n_tickers = len(dates), len(sp500info_df)
+
+    log_returns = rng.normal(0.0003, 0.015, size=(n_dates, n_tickers))
+    close = rng.uniform(10, 500, size=n_tickers) * np.exp(
+        np.cumsum(log_returns, axis=0)
+    )
+    open_ = close * np.exp(rng.normal(0, 0.005, size=close.shape))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, size=close.shape))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, size=close.shape))
+
+    stock_df = pd.DataFrame(
+        {
+            "Date": np.repeat(dates.date, n_tickers),
+            "ticker": np.tile(sp500info_df["Symbol"].to_numpy(), n_dates),
+            "Open": open_.ravel(),
+            "High": high.ravel(),
+            "Low": low.ravel(),
+            "Close": close.ravel(),
+            "GICS Sector": np.tile(sp500info_df["GICS Sector"].to_numpy(), n_dates),
+        }
+    )
+    stock_df["median"] = (stock_df["High"] + stock_df["Low"]) / 2
+    has_news = rng.random(len(stock_df)) < news_per_year / 252
+    stock_df["title"] = pd.Series(
+        np.where(has_news, "Synthetic headline", None), dtype="object"
+    )
+    stock_df["publisher"] = pd.Series(
+        np.where(has_news, "Synthetic News", None), dtype="object"
+    )
+
+    Path(path).unlink(missing_ok=True)
+    con = duckdb.connect(str(path))
+    try:
+        con.register("stock_df", stock_df)
+        con.execute(
+            "CREATE TABLE stock_prices AS SELECT * FROM stock_df ORDER BY ticker, Date"
+        )
+        if intraday_tickers:
+            # 390 minute bars per trading day, from 9:30 to 16:00, moving
+            # linearly from the daily open to close with some noise
+            con.execute(
+                """
+                CREATE TABLE stock_prices_intraday AS
+                SELECT
+                    Timestamp, ticker, Open, Close,
+                    greatest(Open, Close) * (1 + random() * 0.001) AS High,
+                    least(Open, Close) * (1 - random() * 0.001) AS Low,
+                    CAST(random() * 10000 AS BIGINT) AS Volume
+                FROM (
+                    SELECT
+                        CAST(p.Date AS TIMESTAMP) + to_minutes(570 + m.range) AS Timestamp,
+                        p.ticker,
+                        p.Open + (p.Close - p.Open) * m.range / 390 AS Open,
+                        p.Open + (p.Close - p.Open) * (m.range + 1) / 390 AS Close
+                    FROM stock_prices AS p, range(390) AS m
+                    WHERE p.ticker IN (SELECT unnest(?))
+                )
+                ORDER BY ticker, Timestamp
+                """,
+                [list(sp500info_df["Symbol"].iloc[:intraday_tickers])],
+            )
+    finally:
+        con.close()
+
+
+def list_intraday_tickers(path: str | os.PathLike) -> list[str]:
+    """List the tickers with minute bars in a synthetic database
+
+    Args:
+        path (str|os.PathLike): Path of the database file
+
+    Returns:
+        list[str]: Tickers in the stock_prices_intraday table, empty if the
+            table doesn't exist
+    """
+    con = duckdb.connect(str(path), read_only=True)
+    try:
+        tables = {row[0] for row in con.execute("SHOW TABLES").fetchall()}
+        if "stock_prices_intraday" not in tables:
+            return []
+        rows = con.execute(
+            "SELECT DISTINCT ticker FROM stock_prices_intraday ORDER BY ticker"
+        ).fetchall()
+        return [row[0] for row in rows]
+    finally:
+        con.close()
+
+
+# endregion Synthetic Database
+
+
+# region Server
+
+
+class AppServer:
+    """Streamlit server for the app, running in a subprocess
+
+    Args:
+        database (str|os.PathLike): Database the app reads from
+        port (int|None): Port to serve on, a free one is chosen if None
+    """
+
+    def __init__(self, database: str | os.PathLike, port: int | None = None):
+        self.database = database
+        self.port = port or _free_port()
+        self._process: subprocess.Popen | None = None
+        self._peak_kib = 0
+
+    @property
+    def url(self) -> str:
+        """str: Websocket url of the app"""
+        return f"ws://localhost:{self.port}/_stcore/stream"
+
+    def __enter__(self) -> AppServer:
+        env = dict(os.environ, SVIZ_DATABASE=str(self.database))
+        self._process = subprocess.Popen(
+            [
+                sys.executable, "-m", "streamlit", "run", f"{MAIN_PAGE}.py",
+                "--server.address", "localhost",
+                "--server.port", str(self.port),
+                "--server.headless", "true",
+                "--server.fileWatcherType", "none",
+                "--browser.gatherUsageStats", "false",
+            ],
+            cwd=APP_ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            try:
+                urllib.request.urlopen(f"http://localhost:{self.port}/_stcore/health")
+                break
+            except OSError:
+                if time.monotonic() > deadline or self._process.poll() is not None:
+                    self.__exit__()
+                    raise RuntimeError("Streamlit server failed to start")
+                time.sleep(0.2)
+        # Sample in the background, as VmHWM is lost if the server is killed
+        threading.Thread(target=self._monitor_memory, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._process.terminate()
+        self._process.wait()
+
+    @property
+    def returncode(self) -> int | None:
+        """int|None: Exit code of the server, None while it is running"""
+        return self._process.poll()
+
+    def peak_memory_mib(self) -> float:
+        """Peak resident memory of the server in MiB (Linux only)"""
+        self._sample_peak_memory()
+        return self._peak_kib / 1024
+
+    def _sample_peak_memory(self):
+        try:
+            with open(f"/proc/{self._process.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        self._peak_kib = max(self._peak_kib, int(line.split()[1]))
+        except FileNotFoundError:
+            # The server has exited, keep the last sample
+            pass
+
+    def _monitor_memory(self):
+        while self._process.poll() is None:
+            self._sample_peak_memory()
+            time.sleep(0.1)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+# endregion Server
+
+
+# region Client
+
+
+class AppClient:
+    """Scripted client for a streamlit app, acting like one browser session
+
+    Args:
+        url (str): Websocket url of the app
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.page = MAIN_PAGE
+        self.widgets = {}
+        self._states: dict[str, WidgetState] = {}
+        self._connection = None
+
+    async def __aenter__(self) -> AppClient:
+        self._connection = await websocket_connect(
+            self.url, max_message_size=1024**3
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._connection.close()
+
+    async def open(self, page: str):
+        """Navigate to a page, resetting its widgets
+
+        Args:
+            page (str): Name of the page
+        """
+        self.page = page
+        self.widgets = {}
+        self._states = {}
+        await self.run()
+
+    def set_value(self, key: str, value):
+        """Set the value of a widget
+
+        Args:
+            key (str): Key of the widget, or its label if it has no key
+            value: New value of the widget
+        """
+        proto = self.widgets[key]
+        state = WidgetState(id=proto.id)
+        element_type = type(proto).__name__
+        if element_type == "MultiSelect":
+            options = list(proto.options)
+            state.int_array_value.data.extend(options.index(v) for v in value)
+        elif element_type == "Selectbox":
+            state.int_value = list(proto.options).index(value)
+        elif element_type == "Slider":
+            state.double_array_value.data.append(value)
+        elif element_type == "NumberInput":
+            if proto.data_type == NumberInput.INT:
+                state.int_value = value
+            else:
+                state.double_value = value
+        elif element_type == "Checkbox":
+            state.bool_value = value
+        elif element_type == "DateInput":
+            dates = value if isinstance(value, (list, tuple)) else [value]
+            state.string_array_value.data.extend(
+                date.strftime("%Y/%m/%d") for date in dates
+            )
+        else:
+            raise TypeError(f"Setting {element_type} widgets is not supported")
+        self._states[proto.id] = state
+
+    async def click(self, key: str) -> float:
+        """Click a button and wait for the resulting script run
+
+        Args:
+            key (str): Key of the button, or its label if it has no key
+
+        Returns:
+            float: Seconds until the script run finished
+        """
+        button_id = self.widgets[key].id
+        self._states[button_id] = WidgetState(id=button_id, trigger_value=True)
+        try:
+            return await self.run()
+        finally:
+            del self._states[button_id]
+
+    async def run(self) -> float:
+        """Rerun the script with the current widget values
+
+        Returns:
+            float: Seconds until the script run finished
+        """
+        msg = BackMsg()
+        msg.rerun_script.page_name = self.page
+        msg.rerun_script.widget_states.widgets.extend(self._states.values())
+        start = time.perf_counter()
+        await self._connection.write_message(msg.SerializeToString(), binary=True)
+        while True:
+            data = await asyncio.wait_for(self._connection.read_message(), RUN_TIMEOUT)
+            if data is None:
+                raise ConnectionError("Connection to the app closed")
+            fwd = ForwardMsg()
+            fwd.ParseFromString(data)
+            msg_type = fwd.WhichOneof("type")
+            if msg_type == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._add_element(fwd.delta.new_element)
+            elif msg_type == "script_finished":
+                if fwd.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                    raise RuntimeError(f"Script run failed on page {self.page}")
+                return time.perf_counter() - start
+
+    def _add_element(self, element):
+        element_type = element.WhichOneof("type")
+        if element_type == "exception":
+            raise RuntimeError(element.exception.message)
+        proto = getattr(element, element_type)
+        widget_id = getattr(proto, "id", "")
+        if widget_id.startswith("$$WIDGET_ID"):
+            # Widget ids end in their key, or "None" for unkeyed widgets
+            _, _, key = widget_id.split("-", 2)
+            self.widgets[proto.label if key == "None" else key] = proto
+
+
+# endregion Client
+
+
+# region Scenarios
+
+
+def multiselect_scenario(num_tickers: int):
+    """Create a scenario selecting tickers on the main page and submitting
+
+    Args:
+        num_tickers (int): Number of tickers to select
+
+    Returns:
+        Callable: Scenario taking a client, the possible tickers and a
+            random generator, returning the render latency in seconds
+    """
+
+    async def scenario(
+        client: AppClient, tickers: list[str], rng: random.Random
+    ) -> float:
+        await client.open(MAIN_PAGE)
+        client.set_value("Enter tickers of interest", rng.sample(tickers, num_tickers))
+        await client.run()
+        return await client.click("Submit")
+
+    return scenario
+
+
+async def full_aggregate_scenario(
+    client: AppClient, tickers: list[str], rng: random.Random
+) -> float:
+    """Select every ticker on the main page, rendering the aggregate chart"""
+    await client.open(MAIN_PAGE)
+    client.set_value("Enter tickers of interest", tickers)
+    await client.run()
+    return await client.click("Submit")
+
+
+def random_position(
+    tickers: list[str], rng: random.Random
+) -> tuple[str, int, datetime.date, datetime.date]:
+    """Choose a random ticker, amount to invest, and start and end dates"""
+    start = START_DATE + datetime.timedelta(days=rng.randrange(0, 1800))
+    end = start + datetime.timedelta(days=rng.randrange(30, 1800))
+    return rng.choice(tickers), rng.randrange(100, 10000, 100), start, end
+
+
+async def backtest_scenario(
+    client: AppClient, tickers: list[str], rng: random.Random, num_positions: int = 10
+) -> float:
+    """Run a backtest with random positions on the backtesting page"""
+    await client.open(BACKTEST_PAGE)
+    client.set_value("Number of Stocks", num_positions)
+    await client.run()
+    for row in range(num_positions):
+        ticker, invest_amount, start, end = random_position(tickers, rng)
+        client.set_value(f"ticker{row}", ticker)
+        client.set_value(f"invest_amount{row}", invest_amount)
+        client.set_value(f"start_date{row}", start)
+        client.set_value(f"end_date{row}", end)
+    await client.run()
+    return await client.click("Submit")
+
+
+async def intraday_candles_scenario(
+    client: AppClient,
+    tickers: list[str],
+    rng: random.Random,
+    intraday_tickers: list[str] = (),
+) -> float:
+    """Show the candlestick chart of minute bars for a random ticker and
+    range on the main page"""
+    await client.open(MAIN_PAGE)
+    client.set_value(INTRADAY_CHECKBOX, True)
+    client.set_value("Enter tickers of interest", [rng.choice(intraday_tickers)])
+    start = START_DATE + datetime.timedelta(days=rng.randrange(0, 3500))
+    end = start + datetime.timedelta(days=rng.randrange(1, 120))
+    client.set_value("Choose your Date Range of Interest", (start, min(end, END_DATE)))
+    await client.run()
+    return await client.click("Submit")
+
+
+async def intraday_backtest_scenario(
+    client: AppClient,
+    tickers: list[str],
+    rng: random.Random,
+    intraday_tickers: list[str] = (),
+    num_positions: int = 10,
+) -> float:
+    """Run a backtest with random positions on minute bars"""
+    await client.open(BACKTEST_PAGE)
+    client.set_value(INTRADAY_CHECKBOX, True)
+    client.set_value("Number of Stocks", num_positions)
+    await client.run()
+    for row in range(num_positions):
+        ticker, invest_amount, start, end = random_position(intraday_tickers, rng)
+        client.set_value(f"ticker{row}", ticker)
+        client.set_value(f"invest_amount{row}", invest_amount)
+        client.set_value(f"start_date{row}", start)
+        client.set_value(f"end_date{row}", end)
+    await client.run()
+    return await client.click("Submit")
+
+
+SCENARIOS = {
+    "tickers_1": multiselect_scenario(1),
+    "tickers_5": multiselect_scenario(5),
+    "tickers_10": multiselect_scenario(10),
+    "full_aggregate": full_aggregate_scenario,
+    "backtest_10": backtest_scenario,
+}
+
+# Scenarios which need minute bars, taking the tickers that have them as
+# intraday_tickers
+INTRADAY_SCENARIOS = {
+    "intraday_candles": intraday_candles_scenario,
+    "intraday_backtest_10": intraday_backtest_scenario,
+}
+
+
+# endregion Scenarios
+
+
+# region Load Test
+
+
+async def run_load_test(
+    url: str,
+    num_users: int,
+    tickers: list[str],
+    iterations: int = 1,
+    scenarios: dict = SCENARIOS,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Drive the app with many concurrent simulated users
+
+    Each user runs every scenario ``iterations`` times in a random order,
+    in its own session.
+
+    Args:
+        url (str): Websocket url of the app
+        num_users (int): Number of concurrent users
+        tickers (list[str]): Tickers the users choose from
+        iterations (int): Number of times each user runs each scenario
+        scenarios (dict): Scenarios to run, by name
+        seed (int): Seed for the per user random generators
+
+    Returns:
+        pd.DataFrame: One row per render with the user, scenario, latency
+            in seconds and error message if the render failed
+    """
+
+    async def user(user_id: int) -> list[dict]:
+        rng = random.Random(seed * 100003 + user_id)
+        plan = list(scenarios) * iterations
+        rng.shuffle(plan)
+        results = [
+            {"user": user_id, "scenario": name, "latency": np.nan, "error": None}
+            for name in plan
+        ]
+        try:
+            async with AppClient(url) as client:
+                for result in results:
+                    try:
+                        result["latency"] = await scenarios[result["scenario"]](
+                            client, tickers, rng
+                        )
+                    except Exception as e:
+                        result["error"] = repr(e)
+        except OSError as e:
+            # Couldn't connect, e.g. the server was killed for running out of memory
+            for result in results:
+                if np.isnan(result["latency"]):
+                    result["error"] = result["error"] or repr(e)
+        return results
+
+    results = await asyncio.gather(*(user(i) for i in range(num_users)))
+    return pd.DataFrame([r for user_results in results for r in user_results])
+
+
+def summarize(latencies: pd.DataFrame, wall_time: float) -> pd.DataFrame:
+    """Summarize render latencies by scenario
+
+    Args:
+        latencies (pd.DataFrame): Output of run_load_test
+        wall_time (float): Wall clock duration of the load test in seconds
+
+    Returns:
+        pd.DataFrame: Number of successful and failed renders, p50 and p99
+            latency of the successful renders and throughput for each
+            scenario and overall
+    """
+    grouped = latencies.groupby("scenario")
+    summary = pd.DataFrame(
+        {
+            "renders": grouped["latency"].count(),
+            "errors": grouped["error"].count(),
+            "p50 (s)": grouped["latency"].quantile(0.5),
+            "p99 (s)": grouped["latency"].quantile(0.99),
+        }
+    )
+    summary.loc["all"] = [
+        latencies["latency"].count(),
+        latencies["error"].count(),
+        latencies["latency"].quantile(0.5),
+        latencies["latency"].quantile(0.99),
+    ]
+    summary = summary.astype({"renders": int, "errors": int})
+    summary["renders/s"] = summary["renders"] / wall_time
+    return summary
+
+
+# endregion Load Test
+
+
+# region Render Benchmark
+
+
+def benchmark_render(
+    database: str | os.PathLike,
+    tickers: list[str],
+    repeats: int = 10,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Compare the render overhead of altair charts and compiled templates
+
+    Times building each chart and turning it into a streamlit element,
+    through st.altair_chart for the altair path and st.vega_lite_chart for
+    the template path. Streamlit is run in bare mode, so nothing is shown.
+
+    Args:
+        database (str|os.PathLike): Database to read the stock data from
+        tickers (list[str]): Tickers to choose from
+        repeats (int): Number of times each chart is rendered
+        seed (int): Seed for the random number generator
+
+    Returns:
+        pd.DataFrame: Median render time in seconds of each path for each
+            chart, and the speedup of the template path
+    """
+    import ibis
+    import streamlit as st
+
+    from . import backtest, load_frame, stock_chart, templates
+
+    rng = random.Random(seed)
+    stock_prices = ibis.duckdb.connect(str(database), read_only=True).table(
+        "stock_prices"
+    )
+    full_df = load_frame(stock_prices)
+    sizes = dict(width=650, upper_height=300, lower_height=100)
+
+    cases = {}
+    for num_tickers in (1, 5, 10):
+        chosen = rng.sample(tickers, num_tickers)
+        stock_df = full_df[full_df["ticker"].isin(chosen)]
+        cases[f"tickers_{num_tickers}"] = (
+            lambda df=stock_df, t=chosen: stock_chart(df, t, **sizes),
+            lambda df=stock_df, t=chosen: templates.stock_chart_spec(df, t, **sizes),
+        )
+    cases["full_aggregate"] = (
+        lambda: stock_chart(full_df, tickers, **sizes),
+        lambda: templates.stock_chart_spec(full_df, tickers, **sizes),
+    )
+    stock_choice = pd.DataFrame(
+        [random_position(tickers, rng) for _ in range(10)],
+        columns=["ticker", "invest_amount", "start_date", "end_date"],
+    )
+    backtest_df = full_df[full_df["ticker"].isin(stock_choice["ticker"])]
+    cases["backtest_10"] = (
+        lambda: backtest(stock_choice, backtest_df, **sizes),
+        lambda: templates.backtest_spec(stock_choice, backtest_df, **sizes),
+    )
+
+    def median_time(render) -> float:
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            render()
+            times.append(time.perf_counter() - start)
+        return float(np.median(times))
+
+    results = pd.DataFrame(
+        {
+            name: {
+                "altair (s)": median_time(
+                    lambda: st.altair_chart(chart(), use_container_width=True)
+                ),
+                "template (s)": median_time(
+                    lambda: st.vega_lite_chart(spec(), use_container_width=True)
+                ),
+            }
+            for name, (chart, spec) in cases.items()
+        }
+    ).T
+    results["speedup"] = results["altair (s)"] / results["template (s)"]
+    return results
+
+
+# endregion Render Benchmark
+
+
+# region Command Line
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--users", type=int, nargs="+", default=[10, 50, 200],
+        help="Numbers of concurrent users to test",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=1,
+        help="Times each user runs each scenario",
+    )
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=[*SCENARIOS, *INTRADAY_SCENARIOS],
+        default=None,
+        help="Scenarios to run, by default all of them, with the intraday "
+        "ones only if the database has minute bars",
+    )
+    parser.add_argument(
+        "--database", default=None,
+        help="Path of the synthetic database, created if it doesn't exist",
+    )
+    parser.add_argument(
+        "--intraday-tickers", type=int, default=None,
+        help="Number of tickers with minute bars, rebuilding the database "
+        "if it has a different number",
+    )
+    parser.add_argument(
+        "--render-benchmark", action="store_true",
+        help="Compare chart render overhead instead of running the load test",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    database = Path(args.database or APP_ROOT / ".loadtest.duckdb").resolve()
+    if not database.exists():
+        print(f"Creating synthetic database at {database}")
+        make_synthetic_database(
+            database, intraday_tickers=args.intraday_tickers or 0, seed=args.seed
+        )
+    elif (
+        args.intraday_tickers is not None
+        and len(list_intraday_tickers(database)) != args.intraday_tickers
+    ):
+        print(
+            f"Rebuilding synthetic database at {database} with minute bars "
+            f"for {args.intraday_tickers} tickers"
+        )
+        make_synthetic_database(
+            database, intraday_tickers=args.intraday_tickers, seed=args.seed
+        )
+
+    sp500info_df = pd.read_csv(APP_ROOT / "data" / "sp500info.csv", index_col=0)
+    tickers = list(sp500info_df["Symbol"])
+    if args.render_benchmark:
+        results = benchmark_render(database, tickers, seed=args.seed)
+        print(results.round(4).to_string())
+        return
+    intraday_tickers = list_intraday_tickers(database)
+    names = args.scenarios or [
+        *SCENARIOS, *(INTRADAY_SCENARIOS if intraday_tickers else ())
+    ]
+    scenarios = {}
+    for name in names:
+        if name in SCENARIOS:
+            scenarios[name] = SCENARIOS[name]
+        elif intraday_tickers:
+            scenarios[name] = functools.partial(
+                INTRADAY_SCENARIOS[name], intraday_tickers=intraday_tickers
+            )
+        else:
+            parser.error(
+                f"Scenario {name} needs minute bars, pass --intraday-tickers "
+                "to add them to the database"
+            )
+    for num_users in args.users:
+        # Fresh server for each level, so caches start cold and peak memory
+        # is measured for that level alone
+        with AppServer(database) as server:
+            start = time.perf_counter()
+            latencies = asyncio.run(
+                run_load_test(
+                    server.url, num_users, tickers, args.iterations, scenarios,
+                    seed=args.seed,
+                )
+            )
+            wall_time = time.perf_counter() - start
+            print(f"\n{num_users} concurrent users ({wall_time:.1f}s)")
+            print(summarize(latencies, wall_time).round(3).to_string())
+            print(f"Peak server memory: {server.peak_memory_mib():.0f} MiB")
+            if server.returncode is not None:
+                print(f"Server exited during the test with code {server.returncode}")
+            for error in latencies["error"].dropna().unique():
+                print(f"Error: {error}")
+
+
+# endregion Command Line
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# Imports
+# Standard Library Imports
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Hashable, Iterable
+
+# External Imports
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Local Imports
+
+# Columns with few distinct values, stored as categoricals
+CATEGORY_COLUMNS = ("ticker", "GICS Sector", "title", "publisher")
+# Price columns, float32 keeps ~7 significant digits which is plenty for prices
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "median")
+# Date columns, stored as arrow date32 (4 bytes instead of 8 for datetime64)
+DATE_COLUMNS = ("Date",)
+
+# Default memory budget of a FrameBudget (64 MiB)
+DEFAULT_FRAME_BUDGET = 64 * 1024**2
+
+
+# region Dtype Optimization
+
+
+def optimize_arrow(
+    table: pa.Table,
+    category_cols: Iterable[str] = CATEGORY_COLUMNS,
+    float_cols: Iterable[str] = PRICE_COLUMNS,
+    date_cols: Iterable[str] = DATE_COLUMNS,
+) -> pd.DataFrame:
+    """Convert an arrow table to a memory-optimized pandas DataFrame
+
+    The conversion is done on the arrow side, so the string columns are
+    never materialized as python objects.
+
+    Args:
+        table (pa.Table): Table to convert
+        category_cols (Iterable[str]): Columns to store as categoricals
+        float_cols (Iterable[str]): Columns to store as float32
+        date_cols (Iterable[str]): Columns to store as date32
+
+    Returns:
+        pd.DataFrame: DataFrame with optimized dtypes, columns not present
+            in the table are ignored
+    """
+    for col in category_cols:
+        if col in table.column_names:
+            idx = table.column_names.index(col)
+            column = table.column(idx)
+            if not pa.types.is_dictionary(column.type):
+                column = pc.dictionary_encode(column)
+            table = table.set_column(idx, col, column)
+    for col in float_cols:
+        if col in table.column_names:
+            idx = table.column_names.index(col)
+            table = table.set_column(
+                idx, col, table.column(idx).cast(pa.float32(), safe=False)
+            )
+    for col in date_cols:
+        if col in table.column_names:
+            idx = table.column_names.index(col)
+            column = table.column(idx)
+            if pa.types.is_string(column.type) or pa.types.is_large_string(
+                column.type
+            ):
+                column = column.cast(pa.timestamp("s"))
+            table = table.set_column(idx, col, column.cast(pa.date32(), safe=False))
+    return table.to_pandas(
+        types_mapper={pa.date32(): pd.ArrowDtype(pa.date32())}.get,
+        self_destruct=True,
+    )
+
+
+def load_frame(expr, **kwargs) -> pd.DataFrame:
+    """Execute an ibis expression and load the result with optimized dtypes
+
+    Args:
+        expr (ibis.Table): Expression to execute
+        **kwargs: Passed to optimize_arrow
+
+    Returns:
+        pd.DataFrame: Result of the expression with optimized dtypes
+    """
+    return optimize_arrow(expr.to_pyarrow(), **kwargs)
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Measure the memory used by a DataFrame, including its index
+
+    Args:
+        df (pd.DataFrame): DataFrame to measure
+
+    Returns:
+        int: Size of the DataFrame in bytes
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+# endregion Dtype Optimization
+
+
+# region Frame Budget
+
+
+class FrameBudget:
+    """Least recently used cache of DataFrames bounded by their memory use
+
+    Not thread safe, SharedQueryCache wraps it with a lock.
+
+    Args:
+        max_bytes (int): Maximum number of bytes held by the cached frames
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_FRAME_BUDGET):
+        self.max_bytes = max_bytes
+        self._frames: OrderedDict[Hashable, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._bytes_in_use = 0
+
+    @property
+    def bytes_in_use(self) -> int:
+        """int: Number of bytes used by the cached frames"""
+        return self._bytes_in_use
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._frames
+
+    def get(self, key: Hashable) -> pd.DataFrame | None:
+        """Get a cached frame, marking it as most recently used
+
+        Args:
+            key (Hashable): Key the frame was stored under
+
+        Returns:
+            pd.DataFrame|None: The cached frame, or None if not cached
+        """
+        if key not in self._frames:
+            return None
+        self._frames.move_to_end(key)
+        return self._frames[key][0]
+
+    def put(self, key: Hashable, df: pd.DataFrame) -> pd.DataFrame:
+        """Cache a frame, evicting least recently used frames to stay in budget
+
+        Frames larger than the whole budget are not cached.
+
+        Args:
+            key (Hashable): Key to store the frame under
+            df (pd.DataFrame): Frame to cache
+
+        Returns:
+            pd.DataFrame: The frame passed in
+        """
+        self.pop(key)
+        nbytes = frame_nbytes(df)
+        if nbytes > self.max_bytes:
+            return df
+        self._frames[key] = (df, nbytes)
+        self._bytes_in_use += nbytes
+        while self._bytes_in_use > self.max_bytes:
+            self.pop(next(iter(self._frames)))
+        return df
+
+    def pop(self, key: Hashable) -> pd.DataFrame | None:
+        """Remove a frame from the cache
+
+        Args:
+            key (Hashable): Key the frame was stored under
+
+        Returns:
+            pd.DataFrame|None: The removed frame, or None if not cached
+        """
+        if key not in self._frames:
+            return None
+        df, nbytes = self._frames.pop(key)
+        self._bytes_in_use -= nbytes
+        return df
+
+    def clear(self):
+        """Remove all cached frames"""
+        self._frames.clear()
+        self._bytes_in_use = 0
+
+
+# endregion Frame Budget
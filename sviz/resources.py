@@ -0,0 +1,83 @@
+# Imports
+# Standard Library Imports
+from __future__ import annotations
+import os
+
+# External Imports
+import ibis
+import streamlit as st
+
+# Local Imports
+from .intraday import INTRADAY_TABLE
+from .shared_cache import CursorPool, SharedQueryCache
+
+# Resources shared by every session of the app. They are defined once here
+# and imported by the pages, as st.cache_resource keys on the function's
+# module and source, so a copy in each page would create a copy of each
+# resource.
+
+
+@st.cache_resource
+def get_database_connection() -> ibis.BaseBackend:
+    """Connect to the motherduck database, or a local database if the
+    SVIZ_DATABASE environment variable is set (e.g. for load testing)
+
+    Returns:
+        ibis.BaseBackend: Connection shared by all sessions
+    """
+    if "SVIZ_DATABASE" in os.environ:
+        return ibis.duckdb.connect(os.environ["SVIZ_DATABASE"], read_only=True)
+    md_token = st.secrets["MOTHERDUCK_TOKEN"]
+    return ibis.duckdb.connect(f"md:?motherduck_token={md_token}")
+
+
+@st.cache_resource
+def get_query_cache() -> SharedQueryCache:
+    """Get the process wide cache of query results
+
+    This is what bounds the memory of fetched stock data: sessions don't
+    keep their own references to the frames, so evicting from it actually
+    frees them.
+
+    Returns:
+        SharedQueryCache: Cache shared by all sessions
+    """
+    return SharedQueryCache()
+
+
+@st.cache_resource
+def get_cursor_pool() -> CursorPool:
+    """Get the pool of cursors, so parallel sessions don't serialize on one
+    connection
+
+    Returns:
+        CursorPool: Pool shared by all sessions
+    """
+    return CursorPool(get_database_connection().con)
+
+
+@st.cache_resource
+def get_stock_prices() -> ibis.Table:
+    """Get the daily stock prices table
+
+    The table schema is looked up once, as the shared connection isn't
+    thread safe.
+
+    Returns:
+        ibis.Table: Table of daily stock prices
+    """
+    return get_database_connection().table("stock_prices")
+
+
+@st.cache_resource
+def get_intraday_prices() -> ibis.Table | None:
+    """Get the table of minute bars, which is optional
+
+    Returns:
+        ibis.Table|None: Table of minute bars, or None if the database
+            doesn't have one
+    """
+    con = get_database_connection()
+    if INTRADAY_TABLE not in con.list_tables():
+        return None
+    return con.table(INTRADAY_TABLE)
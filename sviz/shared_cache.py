@@ -0,0 +1,143 @@
+# Imports
+# Standard Library Imports
+from __future__ import annotations
+from concurrent.futures import Future
+from contextlib import contextmanager
+import queue
+import threading
+from typing import Callable, Hashable, Iterator
+
+# External Imports
+import ibis
+import pandas as pd
+
+# Local Imports
+from .memory import FrameBudget, optimize_arrow
+
+# Default memory budget for the process wide cache (512 MiB)
+DEFAULT_SHARED_BUDGET = 512 * 1024**2
+# Default number of cursors in the pool
+DEFAULT_POOL_SIZE = 8
+
+
+class CursorPool:
+    """Bounded pool of DuckDB cursors sharing a single database
+
+    Each cursor is an independent connection to the same database, so
+    queries from different sessions can run in parallel instead of
+    serializing on one connection.
+
+    Args:
+        connection (duckdb.DuckDBPyConnection): Connection to create the
+            cursors from
+        size (int): Number of cursors in the pool
+    """
+
+    def __init__(self, connection, size: int = DEFAULT_POOL_SIZE):
+        self.size = size
+        self._cursors = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._cursors.put(connection.cursor())
+
+    @contextmanager
+    def cursor(self, timeout: float | None = None) -> Iterator:
+        """Borrow a cursor from the pool, blocking until one is free
+
+        Args:
+            timeout (float|None): Seconds to wait for a cursor, None waits
+                forever
+
+        Yields:
+            duckdb.DuckDBPyConnection: Cursor, returned to the pool on exit
+        """
+        cur = self._cursors.get(timeout=timeout)
+        try:
+            yield cur
+        finally:
+            self._cursors.put(cur)
+
+
+class SharedQueryCache:
+    """Process wide cache of query results with single-flight loading
+
+    Concurrent requests for the same key wait for the one in-flight load
+    instead of each issuing their own query. Results are kept in a least
+    recently used cache bounded by their memory use, and must be treated
+    as read only since they are shared between sessions.
+
+    Args:
+        max_bytes (int): Maximum number of bytes held by the cached frames
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_SHARED_BUDGET):
+        self._lock = threading.Lock()
+        self._frames = FrameBudget(max_bytes)
+        self._in_flight: dict[Hashable, Future] = {}
+
+    @property
+    def bytes_in_use(self) -> int:
+        """int: Number of bytes used by the cached frames"""
+        with self._lock:
+            return self._frames.bytes_in_use
+
+    def get_or_load(
+        self, key: Hashable, loader: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """Get a cached frame, loading it if not already cached
+
+        Args:
+            key (Hashable): Key identifying the result
+            loader (Callable[[], pd.DataFrame]): Function producing the
+                frame, only called by one thread at a time per key
+
+        Returns:
+            pd.DataFrame: The cached or newly loaded frame
+        """
+        with self._lock:
+            df = self._frames.get(key)
+            if df is not None:
+                return df
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = Future()
+                self._in_flight[key] = flight
+        if not leader:
+            return flight.result()
+        try:
+            df = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            flight.set_exception(e)
+            raise
+        with self._lock:
+            self._frames.put(key, df)
+            del self._in_flight[key]
+        flight.set_result(df)
+        return df
+
+    def clear(self):
+        """Remove all cached frames"""
+        with self._lock:
+            self._frames.clear()
+
+
+def fetch_frame(expr, pool: CursorPool, cache: SharedQueryCache) -> pd.DataFrame:
+    """Execute an ibis expression through the cursor pool and shared cache
+
+    Args:
+        expr (ibis.Table): Expression to execute
+        pool (CursorPool): Pool to borrow a cursor from
+        cache (SharedQueryCache): Cache keyed by the compiled SQL
+
+    Returns:
+        pd.DataFrame: Result of the expression with optimized dtypes
+    """
+    sql = str(ibis.to_sql(expr, dialect="duckdb"))
+
+    def load() -> pd.DataFrame:
+        with pool.cursor() as cur:
+            return optimize_arrow(cur.execute(sql).arrow())
+
+    return cache.get_or_load(sql, load)
@@ -0,0 +1,335 @@
+# Imports
+# Standard Library Imports
+from __future__ import annotations
+
+# External Imports
+import altair as alt
+import numpy as np
+import pandas as pd
+
+# Local Imports
+from .backtest import gains_chart, gains_title
+
+
+# region Price Matrix
+
+
+def price_matrix(
+    stock_df: pd.DataFrame,
+    price: str = "Close",
+    date_col: str = "Date",
+    ticker_col: str = "ticker",
+) -> pd.DataFrame:
+    """Pivot long stock data into a date by ticker matrix of prices
+
+    Args:
+        stock_df (pd.DataFrame): Stock price data, in long format
+        price (str): Name of column containing the price
+        date_col (str): Name of column containing the date
+        ticker_col (str): Name of column containing the tickers
+
+    Returns:
+        pd.DataFrame: Prices with one row per date and one column per ticker,
+            forward filled over missing days, and NaN before a ticker's
+            first price
+    """
+    # Scatter into a matrix directly, which is much faster than pivot_table,
+    # converting only the unique dates and tickers
+    date_codes, dates = pd.factorize(stock_df[date_col], sort=True)
+    ticker_codes, tickers = pd.factorize(stock_df[ticker_col], sort=True)
+    values = np.full((len(dates), len(tickers)), np.nan)
+    values[date_codes, ticker_codes] = stock_df[price].to_numpy(dtype=np.float64)
+    prices = pd.DataFrame(
+        values,
+        index=pd.DatetimeIndex(pd.to_datetime(np.asarray(dates))),
+        columns=np.asarray(tickers).astype(str),
+    )
+    prices.index.name = date_col
+    return prices.ffill()
+
+
+def period_starts(index: pd.DatetimeIndex, frequency: str = "M") -> pd.Series:
+    """Find the first trading day of every period
+
+    Args:
+        index (pd.DatetimeIndex): Trading days
+        frequency (str): Pandas period frequency, like W, M, Q or Y
+
+    Returns:
+        pd.Series: Boolean mask of the days starting a new period
+    """
+    periods = index.to_period(frequency)
+    return pd.Series(
+        np.concatenate([[True], periods[1:] != periods[:-1]]), index=index
+    )
+
+
+# endregion Price Matrix
+
+
+# region Rules
+
+
+def ma_crossover(
+    prices: pd.DataFrame, short_window: int = 50, long_window: int = 200
+) -> pd.DataFrame:
+    """Hold, equally weighted, every ticker whose short moving average is
+    above its long moving average
+
+    Args:
+        prices (pd.DataFrame): Price matrix, as returned by price_matrix
+        short_window (int): Number of days in the short moving average
+        long_window (int): Number of days in the long moving average
+
+    Returns:
+        pd.DataFrame: Target weights on the days any signal changes, and NaN
+            on the days the portfolio is held as is
+    """
+    short_ma = prices.rolling(short_window, min_periods=short_window).mean()
+    long_ma = prices.rolling(long_window, min_periods=long_window).mean()
+    signal = short_ma > long_ma
+    weights = signal.div(signal.sum(axis=1), axis=0).fillna(0.0)
+    changed = (signal != signal.shift(1)).any(axis=1)
+    return weights.where(changed, axis=0)
+
+
+def momentum(
+    prices: pd.DataFrame,
+    lookback: int = 126,
+    top_n: int = 10,
+    rebalance: str = "M",
+) -> pd.DataFrame:
+    """Hold, equally weighted, the top_n tickers with the highest return over
+    the lookback, rebalanced at the start of every period
+
+    Args:
+        prices (pd.DataFrame): Price matrix, as returned by price_matrix
+        lookback (int): Number of days the return is measured over
+        top_n (int): Number of tickers to hold
+        rebalance (str): Pandas period frequency of rebalancing, like W, M,
+            Q or Y
+
+    Returns:
+        pd.DataFrame: Target weights on rebalancing days, and NaN on the days
+            the portfolio is held as is
+    """
+    returns = prices / prices.shift(lookback) - 1
+    rank = returns.rank(axis=1, ascending=False, method="first")
+    selected = rank <= top_n
+    weights = selected.div(selected.sum(axis=1), axis=0).fillna(0.0)
+    return weights.where(period_starts(prices.index, rebalance), axis=0)
+
+
+def dca_schedule(
+    prices: pd.DataFrame, amount: float = 100.0, frequency: str = "M"
+) -> pd.DataFrame:
+    """Invest a fixed amount at the start of every period, split equally
+    between the tickers with a price
+
+    Args:
+        prices (pd.DataFrame): Price matrix, as returned by price_matrix
+        amount (float): Amount invested every period
+        frequency (str): Pandas period frequency of investing, like W, M, Q
+            or Y
+
+    Returns:
+        pd.DataFrame: Amount invested in every ticker on every day
+    """
+    listed = prices.notna()
+    contributions = listed.div(listed.sum(axis=1), axis=0).fillna(0.0) * amount
+    return contributions.where(period_starts(prices.index, frequency), 0.0, axis=0)
+
+
+STRATEGIES = {
+    "ma_crossover": ma_crossover,
+    "momentum": momentum,
+    "dca": dca_schedule,
+}
+
+
+# endregion Rules
+
+
+# region Simulation
+
+
+def simulate_weights(
+    prices: pd.DataFrame, weights: pd.DataFrame, invest_amount: float = 1000.0
+) -> pd.DataFrame:
+    """Find the gains over time of trading to target weights
+
+    Trades happen at the close of the day after the weights are set, so a
+    rule never trades at a price it has already seen, and the number of
+    shares is fixed between trades. Instead of stepping through the days,
+    the days are split into segments between trades, and the value at the
+    start of every segment is the cumulative product of the growth over the
+    segments before it.
+
+    Args:
+        prices (pd.DataFrame): Price matrix, as returned by price_matrix
+        weights (pd.DataFrame): Target weights on trading days, and NaN on
+            other days, as returned by the rules
+        invest_amount (float): Amount initially invested
+
+    Returns:
+        pd.DataFrame: Gains of every ticker over time, with one row per date
+            and one column per ticker
+    """
+    price = np.nan_to_num(prices.to_numpy(dtype=np.float64))
+    target = weights.shift(1).to_numpy(dtype=np.float64)
+    is_trade = ~np.isnan(target).all(axis=1)
+    is_trade[0] = True
+    trade_days = np.flatnonzero(is_trade)
+
+    # Shares bought per dollar of value, and cash held, in every segment
+    target = np.nan_to_num(target[trade_days])
+    start_price = price[trade_days]
+    units = np.divide(
+        target, start_price, out=np.zeros_like(target), where=start_price > 0
+    )
+    cash = 1 - target.sum(axis=1)
+
+    # Value at the start of every segment
+    growth = (units[:-1] * start_price[1:]).sum(axis=1) + cash[:-1]
+    start_value = invest_amount * np.concatenate([[1.0], np.cumprod(growth)])
+
+    # Shares held over every day, set at the close of the day before
+    segment = np.cumsum(is_trade) - 1
+    held = np.concatenate([[0], segment[:-1]])
+    shares = units[held] * start_value[held, np.newaxis]
+
+    pnl = shares[1:] * np.diff(price, axis=0)
+    gains = np.concatenate([np.zeros((1, price.shape[1])), np.cumsum(pnl, axis=0)])
+    return pd.DataFrame(gains, index=prices.index, columns=prices.columns)
+
+
+def simulate_contributions(
+    prices: pd.DataFrame, contributions: pd.DataFrame
+) -> pd.DataFrame:
+    """Find the gains over time of buying fixed amounts of each ticker
+
+    Args:
+        prices (pd.DataFrame): Price matrix, as returned by price_matrix
+        contributions (pd.DataFrame): Amount invested in every ticker on
+            every day, as returned by dca_schedule
+
+    Returns:
+        pd.DataFrame: Gains of every ticker over time, with one row per date
+            and one column per ticker
+    """
+    price = np.nan_to_num(prices.to_numpy(dtype=np.float64))
+    invested = contributions.to_numpy(dtype=np.float64)
+    bought = np.divide(
+        invested, price, out=np.zeros_like(invested), where=price > 0
+    )
+    gains = np.cumsum(bought, axis=0) * price - np.cumsum(invested, axis=0)
+    return pd.DataFrame(gains, index=prices.index, columns=prices.columns)
+
+
+def gains_frame(gains: pd.DataFrame, by_ticker: bool = True) -> pd.DataFrame:
+    """Convert a matrix of gains to the format returned by backtest_gains
+
+    Args:
+        gains (pd.DataFrame): Gains of every ticker over time, as returned by
+            simulate_weights or simulate_contributions
+        by_ticker (bool): Whether to include the tickers ever held, or only
+            the total
+
+    Returns:
+        pd.DataFrame: Long DataFrame with Date, ticker and gains columns,
+            including the sum of all tickers as the Total ticker
+    """
+    total = gains.sum(axis=1)
+    if by_ticker:
+        total_gains = gains.loc[:, (gains != 0).any(axis=0)].copy()
+    else:
+        total_gains = pd.DataFrame(index=gains.index)
+    total_gains["Total"] = total
+    total_gains = total_gains.rename_axis(columns=None).reset_index(names="Date")
+    return pd.melt(total_gains, id_vars="Date", var_name="ticker", value_name="gains")
+
+
+def strategy_gains(
+    stock_df: pd.DataFrame,
+    strategy: str,
+    invest_amount: float = 1000.0,
+    price: str = "Close",
+    by_ticker: bool = True,
+    **params,
+) -> pd.DataFrame:
+    """Find the gains over time of a rule based strategy
+
+    Args:
+        stock_df (pd.DataFrame): Stock price data for every ticker the
+            strategy may trade
+        strategy (str): Name of the strategy, one of the keys of STRATEGIES
+        invest_amount (float): Amount initially invested, or the amount
+            invested every period for dca
+        price (str): Name of column containing the price
+        by_ticker (bool): Whether to include the tickers ever held, or only
+            the total
+        **params: Parameters of the strategy, like short_window or top_n
+
+    Returns:
+        pd.DataFrame: Long DataFrame with Date, ticker and gains columns,
+            including the sum of all tickers as the Total ticker
+    """
+    prices = price_matrix(stock_df, price=price)
+    if strategy == "dca":
+        contributions = dca_schedule(prices, amount=invest_amount, **params)
+        gains = simulate_contributions(prices, contributions)
+    else:
+        weights = STRATEGIES[strategy](prices, **params)
+        gains = simulate_weights(prices, weights, invest_amount=invest_amount)
+    return gains_frame(gains, by_ticker=by_ticker)
+
+
+def strategy_chart(
+    stock_df: pd.DataFrame,
+    strategy: str,
+    invest_amount: float = 1000.0,
+    width: int | float = 650,
+    upper_height: int | float = 650,
+    lower_height: int | float = 100,
+    price: str = "Close",
+    by_ticker: bool = True,
+    **params,
+) -> alt.Chart:
+    """Create the gains chart of a rule based strategy, like backtest does
+
+    Args:
+        stock_df (pd.DataFrame): Stock price data for every ticker the
+            strategy may trade
+        strategy (str): Name of the strategy, one of the keys of STRATEGIES
+        invest_amount (float): Amount initially invested, or the amount
+            invested every period for dca
+        width (int|float): Width of the chart
+        upper_height (int|float): Height of gains chart
+        lower_height (int|float): Height of time selector
+        price (str): Name of column containing the price
+        by_ticker (bool): Whether to show the tickers ever held, or only
+            the total
+        **params: Parameters of the strategy, like short_window or top_n
+
+    Returns:
+        alt.Chart: Line chart of gains with tickers differentiated by color,
+            and time selection chart below
+    """
+    total_gains = strategy_gains(
+        stock_df,
+        strategy,
+        invest_amount=invest_amount,
+        price=price,
+        by_ticker=by_ticker,
+        **params,
+    )
+    return gains_chart(
+        total_gains,
+        width=width,
+        upper_height=upper_height,
+        lower_height=lower_height,
+        title=gains_title(total_gains),
+    )
+
+
+# endregion Simulation
@@ -0,0 +1,288 @@
+# Imports
+# Standard Library Imports
+from __future__ import annotations
+from contextlib import nullcontext
+import functools
+
+# External Imports
+import altair as alt
+import pandas as pd
+
+# Local Imports
+from .backtest import backtest_gains, gains_chart, gains_title
+from .charts import ALTAIR_LOCK, aggregate_company, candlestick, multiple_company
+from .strategies import strategy_gains
+
+# Name of the dataset the templates read from
+DATASET = "stock_data"
+
+CHART_BUILDERS = {
+    "candlestick": candlestick,
+    "multiple_company": multiple_company,
+    "aggregate_company": aggregate_company,
+    "gains": gains_chart,
+}
+
+
+# region Templates
+
+
+@functools.lru_cache(maxsize=128)
+def compile_template(
+    kind: str,
+    width: int | float = 650,
+    upper_height: int | float = 650,
+    lower_height: int | float = 100,
+    **columns: str | None,
+) -> dict:
+    """Compile a chart into a Vega-Lite spec reading from a named dataset
+
+    The spec is compiled once per set of arguments and cached, so later
+    renders only need to inject the data.
+
+    Args:
+        kind (str): Type of chart, one of the keys of CHART_BUILDERS
+        width (int|float): Width of the chart
+        upper_height (int|float): Height of the main chart
+        lower_height (int|float): Height of time selector
+        **columns (str|None): Column name and format arguments passed to the
+            chart function, like date_col or time_format
+
+    Returns:
+        dict: Vega-Lite spec for the chart, which must not be modified
+    """
+    chart = CHART_BUILDERS[kind](
+        alt.NamedData(DATASET),
+        width=width,
+        upper_height=upper_height,
+        lower_height=lower_height,
+        **columns,
+    )
+    # Compile the same way streamlit does, under its theme and with no data
+    # transformation, holding the lock as both are global state
+    with ALTAIR_LOCK:
+        theme = (
+            alt.themes.enable("none")
+            if alt.themes.active == "default"
+            else nullcontext()
+        )
+        with theme, alt.data_transformers.enable("default"):
+            return chart.to_dict()
+
+
+def render_spec(
+    template: dict, data: pd.DataFrame, title: str | dict | None = None
+) -> dict:
+    """Inject data, and optionally a title, into a compiled template
+
+    Args:
+        template (dict): Spec returned by compile_template
+        data (pd.DataFrame): Data for the chart
+        title (str|dict|None): Title of the main chart, or None to keep
+            the template's title
+
+    Returns:
+        dict: Vega-Lite spec with the data in its datasets, ready to be
+            passed to st.vega_lite_chart
+    """
+    # Only copy what changes, the rest of the template is shared
+    spec = dict(template, datasets={DATASET: data})
+    if title is not None:
+        upper, *lower = spec["vconcat"]
+        spec["vconcat"] = [dict(upper, title=title), *lower]
+    return spec
+
+
+# endregion Templates
+
+
+# region Chart Specs
+
+
+def stock_chart_spec(
+    stock_data: pd.DataFrame,
+    tickers: list[str],
+    width: int | float = 650,
+    upper_height: int | float = 650,
+    lower_height: int | float = 100,
+    date_col: str = "Date",
+    ticker_col: str = "ticker",
+    price_col: str = "Close",
+    open_col: str = "Open",
+    close_col: str = "Close",
+    high_col: str = "High",
+    low_col: str = "Low",
+    aggregate_func: str = "mean",
+    time_format: str | None = None,
+) -> dict:
+    """Create the spec of the chart stock_chart would create, from a template
+
+    Args:
+        stock_data (pd.DataFrame): Stock data
+        tickers (list[str]): Tickers selected
+        width (int|float): Width of the chart
+        upper_height (int|float): Height of the main chart
+        lower_height (int|float): Height of time selector
+        date_col (str): Name of column containing the date
+        ticker_col (str): Name of column containing the tickers
+        price_col (str): Name of column containing the price
+        open_col (str): Name of column containing the open price
+        close_col (str): Name of column containing the close price
+        high_col (str): Name of column containing the high price
+        low_col (str): Name of column containing the low price
+        aggregate_func (str): String describing function to use for
+            aggregation, like median, mean, etc.
+        time_format (str|None): D3 time format of dates in the axis and
+            tooltips, like "%Y-%m-%d %H:%M" for intraday bars, or None for
+            the default
+
+    Returns:
+        dict: Vega-Lite spec, ready to be passed to st.vega_lite_chart
+    """
+    sizes = dict(
+        width=width,
+        upper_height=upper_height,
+        lower_height=lower_height,
+        time_format=time_format,
+    )
+    if len(tickers) == 1 and tickers[0] not in ("SP500", "FULL"):
+        template = compile_template(
+            "candlestick",
+            **sizes,
+            date_col=date_col,
+            open_col=open_col,
+            close_col=close_col,
+            high_col=high_col,
+            low_col=low_col,
+        )
+        return render_spec(
+            template, stock_data[stock_data[ticker_col] == tickers[0]]
+        )
+    if 2 <= len(tickers) <= 10:
+        template = compile_template(
+            "multiple_company",
+            **sizes,
+            date_col=date_col,
+            price_col=price_col,
+            ticker_col=ticker_col,
+        )
+        return render_spec(
+            template, stock_data[stock_data[ticker_col].isin(tickers)]
+        )
+    template = compile_template(
+        "aggregate_company",
+        **sizes,
+        date_col=date_col,
+        price_col=price_col,
+        aggregate_func=aggregate_func,
+    )
+    return render_spec(template, stock_data)
+
+
+def backtest_spec(
+    stock_choice: pd.DataFrame,
+    stock_df: pd.DataFrame,
+    width: int | float = 650,
+    upper_height: int | float = 650,
+    lower_height: int | float = 100,
+    price: str = "Close",
+    time_format: str | None = None,
+) -> dict | None:
+    """Create the spec of the chart backtest would create, from a template
+
+    Args:
+        stock_choice (pd.DataFrame): Investments, with ticker, invest_amount,
+            start_date and end_date columns
+        stock_df (pd.DataFrame): Stock price data
+        width (int|float): Width of the chart
+        upper_height (int|float): Height of gains chart
+        lower_height (int|float): Height of time selector
+        price (str): Name of column containing the price
+        time_format (str|None): D3 time format of dates in the tooltips,
+            like "%Y-%m-%d %H:%M" for intraday prices, or None for the default
+
+    Returns:
+        dict|None: Vega-Lite spec, ready to be passed to st.vega_lite_chart,
+            or None if no investments were chosen
+    """
+    if len(stock_choice) == 0:
+        return None
+    total_gains = backtest_gains(stock_choice, stock_df, price=price)
+    return gains_spec(total_gains, width, upper_height, lower_height, time_format)
+
+
+def strategy_spec(
+    stock_df: pd.DataFrame,
+    strategy: str,
+    invest_amount: float = 1000.0,
+    width: int | float = 650,
+    upper_height: int | float = 650,
+    lower_height: int | float = 100,
+    price: str = "Close",
+    by_ticker: bool = True,
+    **params,
+) -> dict:
+    """Create the spec of the gains chart of a rule based strategy, from a
+    template
+
+    Args:
+        stock_df (pd.DataFrame): Stock price data for every ticker the
+            strategy may trade
+        strategy (str): Name of the strategy, one of the keys of STRATEGIES
+        invest_amount (float): Amount initially invested, or the amount
+            invested every period for dca
+        width (int|float): Width of the chart
+        upper_height (int|float): Height of gains chart
+        lower_height (int|float): Height of time selector
+        price (str): Name of column containing the price
+        by_ticker (bool): Whether to show the tickers ever held, or only
+            the total
+        **params: Parameters of the strategy, like short_window or top_n
+
+    Returns:
+        dict: Vega-Lite spec, ready to be passed to st.vega_lite_chart
+    """
+    total_gains = strategy_gains(
+        stock_df,
+        strategy,
+        invest_amount=invest_amount,
+        price=price,
+        by_ticker=by_ticker,
+        **params,
+    )
+    return gains_spec(total_gains, width, upper_height, lower_height)
+
+
+def gains_spec(
+    total_gains: pd.DataFrame,
+    width: int | float = 650,
+    upper_height: int | float = 650,
+    lower_height: int | float = 100,
+    time_format: str | None = None,
+) -> dict:
+    """Create the spec of the gains chart, from a template
+
+    Args:
+        total_gains (pd.DataFrame): Gains, as returned by backtest_gains
+        width (int|float): Width of the chart
+        upper_height (int|float): Height of gains chart
+        lower_height (int|float): Height of time selector
+        time_format (str|None): D3 time format of dates in the tooltips,
+            or None for the default
+
+    Returns:
+        dict: Vega-Lite spec, ready to be passed to st.vega_lite_chart
+    """
+    template = compile_template(
+        "gains",
+        width=width,
+        upper_height=upper_height,
+        lower_height=lower_height,
+        time_format=time_format,
+    )
+    return render_spec(
+        template, total_gains, title=gains_title(total_gains).to_dict()
+    )
+
+
+# endregion Chart Specs
@@ -0,0 +1,152 @@
+# Imports
+# Standard Library Imports
+from __future__ import annotations
+
+# External Imports
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local Imports
+from sviz import strategies
+
+# Ticker which only starts trading partway through the price data
+LATE_TICKER = "LATE"
+LATE_START = 100
+
+
+@pytest.fixture
+def stock_df() -> pd.DataFrame:
+    """Long stock data with random walk prices, like the stock_prices table"""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2020-01-01", periods=300)
+    tickers = ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF", "GGG", LATE_TICKER]
+    close = 100 * np.exp(
+        np.cumsum(rng.normal(0.0005, 0.02, size=(len(dates), len(tickers))), axis=0)
+    )
+    stock_df = pd.DataFrame(close, index=dates, columns=tickers)
+    stock_df.iloc[:LATE_START, tickers.index(LATE_TICKER)] = np.nan
+    stock_df = stock_df.rename_axis(index="Date", columns="ticker").stack()
+    return stock_df.rename("Close").reset_index()
+
+
+@pytest.fixture
+def prices(stock_df: pd.DataFrame) -> pd.DataFrame:
+    return strategies.price_matrix(stock_df)
+
+
+# region Reference Implementations
+
+
+def reference_weights(
+    prices: pd.DataFrame, weights: pd.DataFrame, invest_amount: float
+) -> np.ndarray:
+    """Total gains of trading to target weights, stepping through the days"""
+    price = np.nan_to_num(prices.to_numpy())
+    target = weights.shift(1)
+    shares = np.zeros(price.shape[1])
+    cash = invest_amount
+    gains = []
+    for day in range(len(price)):
+        value = cash + shares @ price[day]
+        gains.append(value - invest_amount)
+        if day == 0 or not target.iloc[day].isna().all():
+            day_weights = np.nan_to_num(target.iloc[day].to_numpy())
+            for col in range(price.shape[1]):
+                shares[col] = (
+                    value * day_weights[col] / price[day, col]
+                    if price[day, col] > 0
+                    else 0.0
+                )
+            cash = value - shares @ price[day]
+    return np.array(gains)
+
+
+def reference_contributions(
+    prices: pd.DataFrame, contributions: pd.DataFrame
+) -> np.ndarray:
+    """Total gains of buying fixed amounts, stepping through the days"""
+    price = np.nan_to_num(prices.to_numpy())
+    shares = np.zeros(price.shape[1])
+    invested = 0.0
+    gains = []
+    for day in range(len(price)):
+        amounts = contributions.iloc[day].to_numpy()
+        for col in range(price.shape[1]):
+            if price[day, col] > 0:
+                shares[col] += amounts[col] / price[day, col]
+        invested += amounts.sum()
+        gains.append(shares @ price[day] - invested)
+    return np.array(gains)
+
+
+# endregion Reference Implementations
+
+
+def test_price_matrix(stock_df: pd.DataFrame, prices: pd.DataFrame):
+    expected = stock_df.pivot(index="Date", columns="ticker", values="Close")
+    np.testing.assert_allclose(prices.to_numpy(), expected.to_numpy())
+    assert prices[LATE_TICKER].iloc[:LATE_START].isna().all()
+    assert prices[LATE_TICKER].iloc[LATE_START:].notna().all()
+
+
+@pytest.mark.parametrize(
+    "rule, params",
+    [
+        (strategies.ma_crossover, dict(short_window=5, long_window=20)),
+        (strategies.momentum, dict(lookback=20, top_n=3, rebalance="W")),
+        (strategies.momentum, dict(lookback=60, top_n=2, rebalance="M")),
+    ],
+)
+def test_simulate_weights_matches_reference(prices: pd.DataFrame, rule, params):
+    weights = rule(prices, **params)
+    gains = strategies.simulate_weights(prices, weights, invest_amount=1000.0)
+    np.testing.assert_allclose(
+        gains.sum(axis=1).to_numpy(),
+        reference_weights(prices, weights, 1000.0),
+        rtol=0,
+        atol=1e-9,
+    )
+
+
+def test_simulate_contributions_matches_reference(prices: pd.DataFrame):
+    contributions = strategies.dca_schedule(prices, amount=100.0, frequency="M")
+    gains = strategies.simulate_contributions(prices, contributions)
+    np.testing.assert_allclose(
+        gains.sum(axis=1).to_numpy(),
+        reference_contributions(prices, contributions),
+        rtol=0,
+        atol=1e-9,
+    )
+
+
+def test_late_listing_ticker(prices: pd.DataFrame):
+    late_prices = prices[LATE_TICKER]
+    # Momentum ranks LATE only once it has a full lookback of prices
+    weights = strategies.momentum(prices, lookback=20, top_n=8, rebalance="W")
+    assert (weights[LATE_TICKER].iloc[: LATE_START + 20].fillna(0) == 0).all()
+    gains = strategies.simulate_weights(prices, weights)
+    assert (gains[LATE_TICKER].iloc[: LATE_START + 21] == 0).all()
+    assert (gains[LATE_TICKER].iloc[LATE_START + 21 :] != 0).any()
+    # Dollar cost averaging only buys LATE once it is listed
+    contributions = strategies.dca_schedule(prices, frequency="W")
+    assert (contributions[LATE_TICKER][late_prices.isna()] == 0).all()
+    assert (contributions[LATE_TICKER][late_prices.notna()] > 0).any()
+
+
+def test_lookback_longer_than_range(prices: pd.DataFrame):
+    weights = strategies.momentum(prices, lookback=len(prices) + 1)
+    gains = strategies.simulate_weights(prices, weights)
+    np.testing.assert_array_equal(gains.to_numpy(), 0.0)
+    np.testing.assert_array_equal(reference_weights(prices, weights, 1000.0), 0.0)
+
+
+@pytest.mark.parametrize("strategy", list(strategies.STRATEGIES))
+def test_strategy_gains_format(stock_df: pd.DataFrame, strategy: str):
+    total_gains = strategies.strategy_gains(stock_df, strategy)
+    assert list(total_gains.columns) == ["Date", "ticker", "gains"]
+    total = total_gains[total_gains["ticker"] == "Total"].set_index("Date")["gains"]
+    by_ticker = (
+        total_gains[total_gains["ticker"] != "Total"].groupby("Date")["gains"].sum()
+    )
+    np.testing.assert_allclose(total.to_numpy(), by_ticker.to_numpy(), atol=1e-9)